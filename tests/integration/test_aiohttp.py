@@ -2,6 +2,7 @@ import io
 import logging
 import ssl
 import urllib.parse
+from unittest import mock
 
 import pytest
 import pytest_httpbin.certs
@@ -311,7 +312,10 @@ def test_redirect(tmpdir, httpbin):
         response, _ = get(url)
 
     with vcr.use_cassette(str(tmpdir.join("redirect.yaml"))) as cassette:
-        cassette_response, _ = get(url)
+        with mock.patch.object(cassette, "find_requests_with_most_matches") as find_similar_requests:
+            cassette_response, _ = get(url)
+        # The redirects matched recorded requests, no similar one was needed
+        find_similar_requests.assert_not_called()
 
         assert cassette_response.status == response.status
         assert len(cassette_response.history) == len(response.history)
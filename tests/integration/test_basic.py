@@ -42,6 +42,37 @@ def test_basic_json_use(tmpdir, httpbin):
         assert b"HTTP Request &amp; Response Service" in response
 
 
+def test_basic_binary_use(tmpdir, httpbin):
+    """
+    Ensure you can record and load a binary serialized cassette
+    """
+    test_fixture = str(tmpdir.join("synopsis.vcr"))
+    with vcr.use_cassette(test_fixture, serializer="binary"):
+        response = urlopen(httpbin.url + "/bytes/1024").read()
+    with vcr.use_cassette(test_fixture, serializer="binary") as cass:
+        assert urlopen(httpbin.url + "/bytes/1024").read() == response
+        assert cass.play_count == 1
+
+
+def test_basic_jsonl_use(tmpdir, httpbin):
+    """
+    Ensure new interactions are appended to a JSON Lines cassette
+    """
+    test_fixture = str(tmpdir.join("synopsis.jsonl"))
+    with vcr.use_cassette(test_fixture, serializer="jsonl"):
+        response = urlopen(httpbin.url + "/html").read()
+    with open(test_fixture) as f:
+        recorded = f.read()
+    with vcr.use_cassette(test_fixture, serializer="jsonl", record_mode=vcr.mode.NEW_EPISODES) as cass:
+        assert urlopen(httpbin.url + "/html").read() == response
+        urlopen(httpbin.url + "/get").read()
+        assert cass.play_count == 1
+    with open(test_fixture) as f:
+        assert f.read().startswith(recorded)
+    with vcr.use_cassette(test_fixture, serializer="jsonl") as cass:
+        assert len(cass) == 2
+
+
 def test_patched_content(tmpdir, httpbin):
     """
     Ensure that what you pull from a cassette is what came from the
@@ -0,0 +1,85 @@
+import timeit
+from io import BytesIO
+
+import pytest
+
+from vcr.request import Request
+from vcr.serialize import deserialize, serialize
+from vcr.serializers import binaryserializer, yamlserializer
+
+
+def _response(body):
+    return {
+        "status": {"code": 200, "message": "OK"},
+        "headers": {
+            "Content-Type": ["application/json"],
+            "Content-Length": [str(len(body))],
+            "Server": ["nginx"],
+            "Date": ["Mon, 01 Jan 2024 00:00:00 GMT"],
+            "Access-Control-Allow-Origin": ["*"],
+        },
+        "body": {"string": body},
+    }
+
+
+def test_serialize_binary_bodies():
+    request = Request("POST", "http://localhost/", b"\x8c\x00", {"Accept": "*/*"})
+    cassette_string = serialize(
+        {"requests": [request], "responses": [_response(b"\xff\xfe")]},
+        binaryserializer,
+    )
+    assert isinstance(cassette_string, bytes)
+
+    (loaded_request,), (loaded_response,) = deserialize(cassette_string, binaryserializer)
+    assert loaded_request.body == b"\x8c\x00"
+    assert loaded_request.headers == {"Accept": "*/*"}
+    assert loaded_response == _response(b"\xff\xfe")
+
+
+def test_serialize_file_and_iterator_bodies():
+    requests = [
+        Request("POST", "http://localhost/", iter([b"chunk", b"ed"]), {}),
+        Request("POST", "http://localhost/", BytesIO(b"file"), {}),
+    ]
+    cassette_string = serialize({"requests": requests, "responses": [_response(b"")] * 2}, binaryserializer)
+    loaded_requests, _ = deserialize(cassette_string, binaryserializer)
+    assert [request.body for request in loaded_requests] == [b"chunked", b"file"]
+
+
+def test_round_trip_values():
+    values = {"a": [None, True, False, 0, -1, 2**70, 1.5, "é", b"\x00", (1, "2")], "b": {}}
+    assert binaryserializer.deserialize(binaryserializer.serialize(values)) == values
+
+
+@pytest.mark.parametrize("cassette_string", [b"", b"not a cassette", binaryserializer.MAGIC + b"s\x00"])
+def test_deserialize_invalid(cassette_string):
+    with pytest.raises(ValueError):
+        binaryserializer.deserialize(cassette_string)
+
+
+def test_serialize_unsupported_type():
+    with pytest.raises(TypeError, match="set"):
+        binaryserializer.serialize({"a": {1}})
+
+
+def test_benchmark_against_yaml():
+    body = b'{"id": 1, "name": "' + b"x" * 2000 + b'"}'
+    requests = [
+        Request("GET", f"http://api.example.com/items/{i}?page=1", None, {"Accept": "application/json"})
+        for i in range(200)
+    ]
+    cassette_dict = {"requests": requests, "responses": [_response(body) for _ in requests]}
+
+    results = {}
+    for serializer in (yamlserializer, binaryserializer):
+        cassette_string = serialize(cassette_dict, serializer)
+        save = min(timeit.repeat(lambda s=serializer: serialize(cassette_dict, s), number=1, repeat=3))
+        load = min(
+            timeit.repeat(lambda s=serializer, c=cassette_string: deserialize(c, s), number=1, repeat=3),
+        )
+        results[serializer.__name__] = (save, load)
+
+    yaml_save, yaml_load = results[yamlserializer.__name__]
+    binary_save, binary_load = results[binaryserializer.__name__]
+    assert binary_load < yaml_load
+    assert binary_save < yaml_save
@@ -1,5 +1,6 @@
 import contextlib
 import copy
+import dataclasses
 import http.client as httplib
 import inspect
 import os
@@ -8,10 +9,13 @@ from unittest import mock
 import pytest
 import yaml
 
+from vcr import mode
 from vcr.cassette import Cassette
 from vcr.errors import UnhandledHTTPRequestError
+from vcr.matchers import headers_subset, keyed, method, requests_match, uri
 from vcr.patch import force_reset
 from vcr.request import Request
+from vcr.serializers import jsonlserializer
 from vcr.stubs import VCRHTTPSConnection
 
 
@@ -69,6 +73,10 @@ def _mock_requests_match(request1, request2, matchers):
     return request1 == request2
 
 
+def _mock_playback(response):
+    return mock.Mock(can_play=True, **{"play.return_value": response})
+
+
 @mock.patch("vcr.cassette.requests_match", _mock_requests_match)
 def test_cassette_contains():
     a = Cassette("test")
@@ -110,7 +118,7 @@ def make_get_request():
     "vcr.cassette.FilesystemPersister.load_cassette",
     classmethod(lambda *args, **kwargs: (("foo",), (mock.MagicMock(),))),
 )
-@mock.patch("vcr.cassette.Cassette.can_play_response_for", return_value=True)
+@mock.patch("vcr.cassette.Cassette.lookup", return_value=_mock_playback(mock.MagicMock()))
 @mock.patch("vcr.stubs.VCRHTTPResponse")
 def test_function_decorated_with_use_cassette_can_be_invoked_multiple_times(*args):
     decorated_function = Cassette.use(path="test")(make_get_request)
@@ -206,8 +214,6 @@ def assert_get_response_body_is(value):
     assert conn.getresponse().read().decode("utf8") == value
 
 
-@mock.patch("vcr.cassette.requests_match", _mock_requests_match)
-@mock.patch("vcr.cassette.Cassette.can_play_response_for", return_value=True)
 @mock.patch("vcr.cassette.Cassette._save", return_value=True)
 def test_nesting_cassette_context_managers(*args):
     first_response = {
@@ -222,14 +228,14 @@ def test_nesting_cassette_context_managers(*args):
     with contextlib.ExitStack() as exit_stack:
         first_cassette = exit_stack.enter_context(Cassette.use(path="test"))
         exit_stack.enter_context(
-            mock.patch.object(first_cassette, "play_response", return_value=first_response),
+            mock.patch.object(first_cassette, "lookup", return_value=_mock_playback(first_response)),
         )
         assert_get_response_body_is("first_response")
 
         # Make sure a second cassette can supersede the first
         with (
             Cassette.use(path="test") as second_cassette,
-            mock.patch.object(second_cassette, "play_response", return_value=second_response),
+            mock.patch.object(second_cassette, "lookup", return_value=_mock_playback(second_response)),
         ):
             assert_get_response_body_is("second_response")
 
@@ -472,3 +478,460 @@ def test_used_interactions(tmpdir):
         saved_content = f.read()
     assert "Authorization" not in saved_content
     assert "secret-token" not in saved_content
+
+
+def test_cassette_index_only_matches_requests_of_the_same_bucket():
+    cassette = Cassette("test", match_on=[method, uri])
+    for i in range(10):
+        cassette.append(Request("GET", f"http://host.com/{i}", "", {}), f"response {i}")
+    cassette.append(Request("POST", "http://host.com/3", "", {}), "post response")
+
+    with mock.patch("vcr.cassette.requests_match", wraps=requests_match) as mocked_requests_match:
+        assert cassette.play_response(Request("GET", "http://host.com/3", "", {})) == "response 3"
+    # The keys of the built-in matchers imply a match, the matchers don't even run
+    assert mocked_requests_match.call_count == 0
+
+
+def test_cassette_index_keeps_recording_order_with_unindexed_requests():
+    class UnhashableStr(str):
+        __hash__ = None
+
+    cassette = Cassette("test", match_on=[method, uri])
+    cassette.append(Request("GET", "http://host.com/", "", {}), "first")
+    cassette.append(Request(UnhashableStr("GET"), "http://host.com/", "", {}), "unindexed")
+    cassette.append(Request("GET", "http://host.com/", "", {}), "third")
+
+    request = Request("GET", "http://host.com/", "", {})
+    assert cassette.responses_of(request) == ["first", "unindexed", "third"]
+    assert cassette.play_response(request) == "first"
+    assert cassette.play_response(request) == "unindexed"
+    assert cassette.play_response(request) == "third"
+    assert request not in cassette
+
+
+def test_cassette_index_follows_data_replacement():
+    cassette = Cassette("test", match_on=[method, uri])
+    cassette.append(Request("GET", "http://host.com/", "", {}), "response")
+    request = Request("GET", "http://host.com/", "", {})
+    assert request in cassette
+
+    cassette.data = []
+    assert request not in cassette
+
+
+def test_cassette_index_uses_custom_matcher_keys():
+    @keyed(lambda request: request.headers.get("X-Version"))
+    def version(r1, r2):
+        assert r1.headers.get("X-Version") == r2.headers.get("X-Version")
+
+    version_matcher = mock.Mock(wraps=version, key=version.key, key_implies_match=False)
+    version_matcher.__name__ = "version"
+    cassette = Cassette("test", match_on=[method, version_matcher])
+    for i in range(10):
+        cassette.append(Request("GET", "http://host.com/", "", {"X-Version": str(i)}), f"response {i}")
+
+    request = Request("GET", "http://host.com/", "", {"X-Version": "3"})
+    assert cassette.play_response(request) == "response 3"
+    # Only the matcher whose key doesn't imply a match runs, on one candidate
+    assert version_matcher.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "load_fingerprint, refilter_on_load, expect_filtered",
+    [("fingerprint", False, False), ("other", False, True), ("fingerprint", True, True), (None, False, True)],
+)
+def test_cassette_load_skips_filters_of_the_same_configuration(
+    tmpdir,
+    load_fingerprint,
+    refilter_on_load,
+    expect_filtered,
+):
+    path = str(tmpdir.join("test_cassette.yml"))
+    cassette = Cassette(path, filter_fingerprint="fingerprint")
+    cassette.append(Request("GET", "http://host.com/", "", {}), "response")
+    cassette._save()
+    with open(path) as f:
+        assert "filter_fingerprint: fingerprint" in f.read()
+
+    before_record_request = mock.Mock(side_effect=lambda request: request)
+    before_record_response = mock.Mock(side_effect=lambda response: response)
+    cassette = Cassette.load(
+        path=path,
+        before_record_request=before_record_request,
+        before_record_response=before_record_response,
+        filter_fingerprint=load_fingerprint,
+        refilter_on_load=refilter_on_load,
+    )
+    assert len(cassette) == 1
+    assert before_record_request.called is expect_filtered
+    assert before_record_response.called is expect_filtered
+
+
+def test_cassette_lookup_filters_the_request_once():
+    before_record_request = mock.Mock(side_effect=lambda request: request)
+    cassette = Cassette("test", before_record_request=before_record_request)
+    cassette.data.append((Request("GET", "http://host.com/", "", {}), "response"))
+    cassette.rewound = True
+
+    playback = cassette.lookup(Request("GET", "http://host.com/", "", {}))
+    assert playback.can_play
+    assert playback.play() == "response"
+    assert before_record_request.call_count == 1
+    assert cassette.play_count == 1
+    assert not cassette.lookup(Request("GET", "http://host.com/", "", {})).can_play
+
+
+def test_cassette_lookup_of_filtered_out_request():
+    cassette = Cassette("test", before_record_request=lambda request: None)
+    cassette.rewound = True
+
+    playback = cassette.lookup(Request("GET", "http://host.com/", "", {}))
+    assert not playback.can_play
+    assert playback.filtered_request is None
+
+
+@pytest.mark.parametrize("record_mode, rewound", [(mode.ALL, True), (mode.ONCE, False)])
+def test_cassette_lookup_cannot_play_when_not_replaying(record_mode, rewound):
+    cassette = Cassette("test", record_mode=record_mode)
+    cassette.append(Request("GET", "http://host.com/", "", {}), "response")
+    cassette.rewound = rewound
+
+    playback = cassette.lookup(Request("GET", "http://host.com/", "", {}))
+    assert not playback.can_play
+    assert playback.filtered_request is not None
+
+
+def test_cassette_playback_played_since_lookup():
+    cassette = Cassette("test")
+    cassette.append(Request("GET", "http://host.com/", "", {}), "first")
+    cassette.append(Request("GET", "http://host.com/", "", {}), "second")
+    cassette.rewound = True
+
+    request = Request("GET", "http://host.com/", "", {})
+    playback = cassette.lookup(request)
+    assert cassette.play_response(request) == "first"
+    assert playback.play() == "second"
+    with pytest.raises(UnhandledHTTPRequestError):
+        playback.play()
+
+
+def test_cassette_plays_identical_requests_in_recording_order():
+    cassette = Cassette("test", match_on=[method, uri])
+    for i in range(5):
+        cassette.append(Request("GET", "http://host.com/poll", "", {}), f"poll {i}")
+        cassette.append(Request("GET", "http://host.com/other", "", {}), f"other {i}")
+    cassette.rewound = True
+
+    request = Request("GET", "http://host.com/poll", "", {})
+    assert [cassette.play_response(request) for _ in range(3)] == ["poll 0", "poll 1", "poll 2"]
+    # Responses marked as played behind the cassette's back are skipped too
+    cassette.play_counts[6] += 1
+    assert cassette.play_response(request) == "poll 4"
+    assert request not in cassette
+
+    cassette.rewind()
+    assert cassette.play_response(request) == "poll 0"
+    cassette.allow_playback_repeats = True
+    assert cassette.play_response(request) == "poll 0"
+    cassette.allow_playback_repeats = False
+    assert cassette.play_response(request) == "poll 1"
+
+
+def test_cassette_playback_of_a_match_behind_unplayed_candidates():
+    @keyed(lambda request: request.method)
+    def odd_body(r1, r2):
+        return r1.body == r2.body
+
+    cassette = Cassette("test", match_on=[odd_body])
+    for body in (b"a", b"b", b"a", b"b"):
+        cassette.append(Request("POST", "http://host.com/", body, {}), body)
+
+    request = Request("POST", "http://host.com/", b"b", {})
+    assert cassette.play_response(request) == b"b"
+    assert cassette.play_response(Request("POST", "http://host.com/", b"a", {})) == b"a"
+    assert cassette.play_response(request) == b"b"
+    assert list(cassette._unplayed[("POST",)]) == [2]
+
+
+def test_cassette_adaptive_match_order():
+    def same_body(r1, r2):
+        return r1.body == r2.body
+
+    cassette = Cassette("test", match_on=[method, same_body], adaptive_match_order=True)
+    for i in range(10):
+        cassette.append(Request("POST", "http://host.com/", str(i), {}), f"response {i}")
+
+    assert cassette.play_response(Request("POST", "http://host.com/", "3", {})) == "response 3"
+    # The method is matched by the index, lookups only run same_body
+    assert cassette.matcher_statistics == [
+        {"matcher": "same_body", "evaluations": 4, "rejections": 3, "time": mock.ANY},
+    ]
+    assert Cassette("test").matcher_statistics is None
+
+
+def test_cassette_adaptive_match_order_reports_the_order_in_use():
+    def accept_all(r1, r2):
+        return True
+
+    def same_body(r1, r2):
+        return r1.body == r2.body
+
+    cassette = Cassette("test", match_on=[method, accept_all, same_body], adaptive_match_order=True)
+    cassette.allow_playback_repeats = True
+    for i in range(10):
+        cassette.append(Request("POST", "http://host.com/", str(i), {}), f"response {i}")
+    assert [row["matcher"] for row in cassette.matcher_statistics] == ["accept_all", "same_body"]
+
+    for _ in range(15):
+        assert cassette.play_response(Request("POST", "http://host.com/", "9", {})) == "response 9"
+    # accept_all never rejects anything, it now runs last
+    assert [row["matcher"] for row in cassette.matcher_statistics] == ["same_body", "accept_all"]
+
+
+def test_new_interactions_are_the_recorded_ones_not_matching_loaded_ones(tmpdir):
+    path = str(tmpdir.join("test_cassette.yml"))
+    cassette = Cassette(path)
+    for i in range(3):
+        cassette.append(Request("GET", f"http://host.com/{i}", "", {}), f"response {i}")
+    cassette._save()
+
+    cassette = Cassette.load(path=path)
+    assert cassette._new_interactions() == []
+
+    matching_old = (Request("GET", "http://host.com/1", "", {}), "re-recorded response 1")
+    new = (Request("GET", "http://host.com/3", "", {}), "response 3")
+    cassette.append(*matching_old)
+    cassette.append(*new)
+    with mock.patch("vcr.cassette.requests_match", wraps=requests_match) as mocked_requests_match:
+        assert cassette._new_interactions() == [new]
+    # No pairwise comparison, the interactions are looked up in the index
+    assert mocked_requests_match.call_count == 0
+
+
+def test_find_requests_with_most_matches_limit():
+    cassette = Cassette("test", match_on=[method, uri])
+    for path in ("a", "b", "c", "d"):
+        cassette.append(Request("GET", f"http://host.com/{path}", "", {}), "response")
+    cassette.append(Request("POST", "http://host.com/e", "", {}), "response")
+
+    request = Request("GET", "http://host.com/x", "", {})
+    assert [r.uri for r, _, _ in cassette.find_requests_with_most_matches(request)] == [
+        "http://host.com/a",
+        "http://host.com/b",
+        "http://host.com/c",
+        "http://host.com/d",
+    ]
+    assert [r.uri for r, _, _ in cassette.find_requests_with_most_matches(request, limit=2)] == [
+        "http://host.com/a",
+        "http://host.com/b",
+    ]
+
+
+def test_record_fingerprints():
+    request = Request("GET", "http://host.com/", "", {})
+    cassette = Cassette("test", record_fingerprints=True, match_on=[uri, method, lambda r1, r2: True])
+    cassette.append(request, "response")
+    assert cassette._as_dict()["fingerprint_fields"] == ["method", "uri"]
+    assert cassette._as_dict()["fingerprints"] == [request.fingerprint(["method", "uri"])]
+    assert "fingerprints" not in Cassette("test")._as_dict()
+
+
+def test_unhashable_matcher():
+    @dataclasses.dataclass
+    class SameMethod:
+        def __call__(self, r1, r2):
+            assert r1.method == r2.method
+
+    request = Request("GET", "http://host.com/", "", {})
+    for record_fingerprints in (False, True):
+        cassette = Cassette("test", match_on=[uri, SameMethod()], record_fingerprints=record_fingerprints)
+        cassette.append(request, "response")
+        assert request in cassette
+    assert cassette._as_dict()["fingerprint_fields"] == ["uri"]
+
+
+@pytest.mark.parametrize(("match_on", "appends"), [((method, uri), True), ((uri,), False)])
+def test_record_fingerprints_appends_with_the_same_fields(tmpdir, match_on, appends):
+    cassette_path = str(tmpdir.join("test.jsonl"))
+    options = {"serializer": jsonlserializer, "filter_fingerprint": "filters", "record_fingerprints": True}
+    cassette = Cassette(cassette_path, **options)
+    cassette.append(Request("GET", "http://host.com/a", "", {}), "response")
+    cassette._save()
+
+    cassette = Cassette.load(path=cassette_path, match_on=match_on, **options)
+    assert bool(cassette._saved_count) is appends
+
+
+def test_headers_subset_index():
+    api_version = headers_subset(["X-Api-Version"])
+    cassette = Cassette("test", match_on=[method, uri, api_version])
+    for version in ("1", "2"):
+        cassette.append(Request("GET", "http://host.com/", "", {"X-Api-Version": version}), version)
+
+    assert cassette._index_key(Request("GET", "http://host.com/", "", {"x-api-version": "2"})) == (
+        "GET",
+        "http://host.com/",
+        ("2",),
+    )
+    assert cassette.play_response(Request("GET", "http://host.com/", "", {"x-api-version": "2"})) == "2"
+
+
+def test_cassette_lazy_load(tmpdir):
+    path = str(tmpdir.join("test_cassette.yml"))
+    cassette = Cassette(path, filter_fingerprint="fingerprint")
+    for name in ("a", "b", "c"):
+        response = {
+            "status": {"code": 200, "message": "OK"},
+            "headers": {},
+            "body": {"string": name.encode()},
+        }
+        cassette.append(Request("GET", f"http://host.com/{name}", "", {}), response)
+    cassette._save()
+
+    cassette = Cassette.load(path=path, filter_fingerprint="fingerprint", lazy_load=True)
+    assert len(cassette) == 3
+    assert all(interaction._request is None for interaction in cassette.data)
+
+    response = cassette.play_response(Request("GET", "http://host.com/b", "", {}))
+    assert response["body"]["string"] == b"b"
+    # Looking the request up indexed the requests, only b's response was built
+    assert [interaction._response is not None for interaction in cassette.data] == [False, True, False]
+    assert cassette.responses_of(Request("GET", "http://host.com/c", "", {}))[0]["body"]["string"] == b"c"
+
+    # Saving the cassette writes the same interactions back
+    cassette._save(force=True)
+    cassette = Cassette.load(path=path, filter_fingerprint="fingerprint")
+    assert [request.uri for request in cassette.requests] == [f"http://host.com/{name}" for name in "abc"]
+    assert [response["body"]["string"] for response in cassette.responses] == [b"a", b"b", b"c"]
+
+
+def test_cassette_lazy_load_refilters(tmpdir):
+    path = str(tmpdir.join("test_cassette.yml"))
+    cassette = Cassette(path, filter_fingerprint="fingerprint")
+    cassette.append(Request("GET", "http://host.com/", "", {}), "response")
+    cassette._save()
+
+    before_record_request = mock.Mock(side_effect=lambda request: request)
+    cassette = Cassette.load(
+        path=path,
+        before_record_request=before_record_request,
+        filter_fingerprint="other",
+        lazy_load=True,
+    )
+    assert before_record_request.called
+    # The interactions went through the filters, which built them
+    assert [type(interaction) for interaction in cassette.data] == [tuple]
+    assert cassette.responses == ["response"]
+
+
+def test_cassette_save_appends_new_interactions(tmpdir):
+    path = tmpdir.join("test_cassette.jsonl")
+    options = {"path": str(path), "serializer": jsonlserializer, "filter_fingerprint": "fingerprint"}
+    cassette = Cassette(**options)
+    cassette.append(Request("GET", "http://host.com/a", "", {}), "a")
+    cassette.append(Request("GET", "http://host.com/b", "", {}), "b")
+    cassette._save()
+    saved = path.read()
+
+    cassette = Cassette.load(record_mode=mode.NEW_EPISODES, **options)
+    assert cassette.play_response(Request("GET", "http://host.com/a", "", {})) == "a"
+    cassette.append(Request("GET", "http://host.com/c", "", {}), "c")
+    cassette._save()
+    # Only the new interaction was written, after the saved ones
+    assert path.read().startswith(saved)
+    assert len(path.read().splitlines()) == 4
+    cassette.append(Request("GET", "http://host.com/d", "", {}), "d")
+    cassette._save()
+    assert Cassette.load(**options).responses == ["a", "b", "c", "d"]
+
+    # Forced saves rewrite the cassette
+    cassette.data[3] = (cassette.data[3][0], "e")
+    cassette._save(force=True)
+    assert Cassette.load(**options).responses == ["a", "b", "c", "e"]
+
+
+def test_cassette_save_appends_without_building_the_loaded_interactions(tmpdir):
+    path = tmpdir.join("test_cassette.jsonl")
+    options = {
+        "path": str(path),
+        "serializer": jsonlserializer,
+        "filter_fingerprint": "fingerprint",
+        "record_fingerprints": True,
+    }
+    cassette = Cassette(**options)
+    for name in "ab":
+        cassette.append(Request("GET", f"http://host.com/{name}", "", {}), name)
+    cassette._save()
+
+    cassette = Cassette.load(record_mode=mode.NEW_EPISODES, lazy_load=True, **options)
+    cassette.append(Request("GET", "http://host.com/c", "", {}), "c")
+    cassette._save()
+    assert [interaction._request for interaction in cassette.data[:2]] == [None, None]
+    assert Cassette.load(**options).responses == ["a", "b", "c"]
+
+    # The cassette is rewritten once interactions are changed in place
+    del cassette.data[0]
+    cassette.append(Request("GET", "http://host.com/d", "", {}), "d")
+    cassette._save()
+    assert Cassette.load(**options).responses == ["b", "c", "d"]
+
+
+def test_cassette_save_compacts_unused_interactions(tmpdir):
+    path = tmpdir.join("test_cassette.jsonl")
+    options = {"path": str(path), "serializer": jsonlserializer, "filter_fingerprint": "fingerprint"}
+    cassette = Cassette(**options)
+    for name in "abc":
+        cassette.append(Request("GET", f"http://host.com/{name}", "", {}), name)
+    cassette._save()
+
+    cassette = Cassette.load(record_mode=mode.NEW_EPISODES, drop_unused_requests=True, **options)
+    cassette.play_response(Request("GET", "http://host.com/b", "", {}))
+    cassette.append(Request("GET", "http://host.com/d", "", {}), "d")
+    cassette._save()
+    assert Cassette.load(**options).responses == ["b", "d"]
+
+
+def test_cassette_save_rewrites_refiltered_cassettes(tmpdir):
+    path = tmpdir.join("test_cassette.jsonl")
+    cassette = Cassette(str(path), serializer=jsonlserializer, filter_fingerprint="fingerprint")
+    cassette.append(Request("GET", "http://host.com/a", "", {}), "a")
+    cassette._save()
+
+    cassette = Cassette.load(
+        path=str(path),
+        serializer=jsonlserializer,
+        record_mode=mode.NEW_EPISODES,
+        before_record_response=str.upper,
+        filter_fingerprint="other",
+    )
+    cassette.append(Request("GET", "http://host.com/b", "", {}), "b")
+    cassette._save()
+    assert path.read().splitlines()[0] == '{"version": 1, "filter_fingerprint": "other"}'
+    assert Cassette.load(path=str(path), serializer=jsonlserializer).responses == ["A", "B"]
+
+
+def test_cassette_index_follows_changes_of_data():
+    cassette = Cassette("test")
+    cassette.rewound = True
+    cassette.allow_playback_repeats = True
+    for name in "ab":
+        cassette.append(Request("GET", f"http://host.com/{name}", "", {}), name)
+    assert cassette.play_response(Request("GET", "http://host.com/a", "", {})) == "a"
+
+    # Replaced in place
+    cassette.data[0] = (Request("GET", "http://host.com/c", "", {}), "c")
+    assert Request("GET", "http://host.com/a", "", {}) not in cassette
+    assert cassette.play_response(Request("GET", "http://host.com/c", "", {})) == "c"
+
+    # Reassigned with as many interactions
+    cassette.data = [
+        (Request("GET", "http://host.com/d", "", {}), "d"),
+        (Request("GET", "http://host.com/e", "", {}), "e"),
+    ]
+    assert Request("GET", "http://host.com/c", "", {}) not in cassette
+    assert cassette.play_response(Request("GET", "http://host.com/e", "", {})) == "e"
+
+    # Appending keeps the index
+    cassette.data.append((Request("GET", "http://host.com/f", "", {}), "f"))
+    assert cassette.play_response(Request("GET", "http://host.com/f", "", {})) == "f"
+    assert cassette._indexed_changes == cassette.data.changes
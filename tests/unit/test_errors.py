@@ -75,3 +75,35 @@ def test_CannotOverwriteExistingCassetteException_get_message(
         f"{expected_message}"
     )
     assert exception_message == expected
+
+
+@mock.patch("vcr.cassette.Cassette.find_requests_with_most_matches", return_value=[])
+def test_CannotOverwriteExistingCassetteException_message_is_lazy(mock_find_requests_with_most_matches):
+    cassette = Cassette("path")
+    exception = errors.CannotOverwriteExistingCassetteException(cassette=cassette, failed_request="request")
+    assert not mock_find_requests_with_most_matches.called
+
+    assert "No similar requests" in str(exception)
+    assert "No similar requests" in str(exception)
+    assert mock_find_requests_with_most_matches.call_count == 1
+    # The message is also reachable the way it is from other exceptions
+    assert exception.args == (str(exception),)
+    assert repr(exception) == f"CannotOverwriteExistingCassetteException({str(exception)!r})"
+    assert mock_find_requests_with_most_matches.call_count == 1
+
+
+@mock.patch("vcr.cassette.Cassette.find_requests_with_most_matches")
+def test_CannotOverwriteExistingCassetteException_message_is_bounded(mock_find_requests_with_most_matches):
+    max_similar_requests = errors.CannotOverwriteExistingCassetteException.max_similar_requests
+    mock_find_requests_with_most_matches.return_value = [
+        (f"similar request {i}", ["method"], [("query", "failed : query")])
+        for i in range(max_similar_requests + 1)
+    ]
+    exception_message = errors.CannotOverwriteExistingCassetteException._get_message(
+        Cassette("path"),
+        "request",
+    )
+    mock_find_requests_with_most_matches.assert_called_once_with("request", limit=max_similar_requests + 1)
+    assert f"Found more than {max_similar_requests} similar requests" in exception_message
+    assert f"similar request {max_similar_requests - 1}" in exception_message
+    assert f"similar request {max_similar_requests}" not in exception_message
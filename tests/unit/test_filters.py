@@ -9,11 +9,13 @@ from vcr.filters import (
     remove_headers,
     remove_post_data_parameters,
     remove_query_parameters,
+    replace_body_with_digest,
     replace_headers,
     replace_post_data_parameters,
     replace_query_parameters,
 )
 from vcr.request import Request
+from vcr.util import digest_body
 
 
 def test_replace_headers():
@@ -349,3 +351,15 @@ def test_decode_response_gzip_already_decompressed():
     }
     decoded_response = decode_response(gzip_response)
     assert decoded_response["body"]["string"] == body
+
+
+def test_replace_body_with_digest():
+    body = b"0123456789"
+    request = Request("PUT", "http://google.com/upload", BytesIO(body), {"Content-Type": "text/plain"})
+    assert replace_body_with_digest(request, 10) is request
+
+    digested = replace_body_with_digest(request, 9)
+    assert digested.body == digest_body(body)
+    assert digested.body.endswith(b";length=10")
+    assert digested.headers == {"Content-Type": "text/plain"}
+    assert replace_body_with_digest(digested, 9) is digested
@@ -0,0 +1,50 @@
+import pytest
+
+from vcr.request import Request
+from vcr.serialize import deserialize, serialize
+from vcr.serializers import jsonlserializer
+
+
+def test_serialize_jsonl():
+    cassette_dict = {
+        "version": 1,
+        "interactions": [
+            {"request": {"uri": "http://localhost/"}},
+            {"request": {"uri": "http://localhost/\n"}},
+        ],
+        "filter_fingerprint": "fingerprint",
+    }
+    cassette_string = jsonlserializer.serialize(cassette_dict)
+    assert cassette_string.splitlines() == [
+        '{"version": 1, "filter_fingerprint": "fingerprint"}',
+        '{"request": {"uri": "http://localhost/"}}',
+        '{"request": {"uri": "http://localhost/\\n"}}',
+    ]
+    assert jsonlserializer.deserialize(cassette_string) == cassette_dict
+    # Appended records follow the ones of the cassette
+    chunks = []
+    jsonlserializer.append_to([{"request": {"uri": "http://localhost/new"}}], chunks.append)
+    appended = jsonlserializer.deserialize(cassette_string + "".join(chunks))
+    assert appended["interactions"][2] == {"request": {"uri": "http://localhost/new"}}
+
+
+def test_deserialize_empty_jsonl():
+    with pytest.raises(ValueError, match="Empty"):
+        jsonlserializer.deserialize("\n")
+
+
+def test_serialize_jsonl_binary():
+    request = Request(method="GET", uri="http://localhost/", body="", headers={})
+    with pytest.raises(TypeError, match="binary data"):
+        serialize({"requests": [request], "responses": [{"body": {"string": b"\x8c"}}]}, jsonlserializer)
+
+
+def test_jsonl_cassette_round_trip():
+    request = Request(method="POST", uri="http://localhost/", body=b"body", headers={"Accept": "*/*"})
+    response = {"status": {"code": 200, "message": "OK"}, "headers": {}, "body": {"string": b"ok"}}
+    requests, responses = deserialize(
+        serialize({"requests": [request], "responses": [response]}, jsonlserializer),
+        jsonlserializer,
+    )
+    assert requests[0].fingerprint() == request.fingerprint()
+    assert responses[0]["body"]["string"] == b"ok"
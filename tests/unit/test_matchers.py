@@ -1,9 +1,10 @@
 import itertools
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 
-from vcr import matchers, request
+from vcr import matchers, request, util
 
 # the dict contains requests with corresponding to its key difference
 # with 'base' request.
@@ -222,6 +223,62 @@ def test_body_match_does_not_match(r1, r2):
         matchers.body(r1, r2)
 
 
+def test_body_digest_matcher():
+    body = b'{"a": 1}' * 10
+    headers = {"Content-Type": "application/json"}
+    r1 = request.Request("POST", "http://host.com/", body, headers)
+    r2 = request.Request("POST", "http://host.com/", iter([body]), {})
+    r3 = request.Request("POST", "http://host.com/", util.digest_body(body), headers)
+    r4 = request.Request("POST", "http://host.com/", body + b" ", {})
+    for matcher in (matchers.body_digest, matchers.raw_body, matchers.body):
+        assert matcher(r1, r3) is None
+        assert matcher(r3, r2) is None
+        with pytest.raises(AssertionError):
+            matcher(r3, r4)
+    assert matchers.body_digest(r1, r2) is None
+    assert matchers.body_digest.key(r1) == util.digest_body(body)
+
+
+def test_body_digest_is_computed_once_per_body():
+    r1 = request.Request("POST", "http://host.com/", b"body", {})
+    r2 = request.Request("POST", "http://host.com/", b"body", {})
+    with mock.patch("vcr.request.digest_body", wraps=util.digest_body) as digest_body:
+        for _ in range(3):
+            assert matchers.body_digest(r1, r2) is None
+        assert digest_body.call_count == 2
+
+        r1.body = b"other"
+        with pytest.raises(AssertionError):
+            matchers.body_digest(r1, r2)
+        assert digest_body.call_count == 3
+
+
+def test_headers_matcher_key():
+    r1 = request.Request("GET", "http://host.com/", "", {"Accept": "*/*", "X-Version": "1"})
+    r2 = request.Request("GET", "http://host.com/", "", {"x-version": "1", "accept": "*/*"})
+    r3 = request.Request("GET", "http://host.com/", "", {"Accept": "*/*", "X-Version": ["2"]})
+    assert matchers.headers.key(r1) == matchers.headers.key(r2)
+    assert matchers.headers.key(r1) != matchers.headers.key(r3)
+    assert matchers.key_implies_match(matchers.headers)
+
+    r4 = request.Request("GET", "http://host.com/", "", {"Accept": {"*/*"}})
+    assert matchers.headers.key(r4) == {"accept": {"*/*"}}
+    assert not matchers.MatcherChain([matchers.headers])(r1, r4)
+
+
+def test_headers_subset_matcher():
+    api_headers = matchers.headers_subset(["Accept", "X-Api-Version"])
+    r1 = request.Request("GET", "http://host.com/", "", {"Accept": "*/*", "Date": "today"})
+    r2 = request.Request("GET", "http://host.com/", "", {"accept": "*/*", "Date": "tomorrow"})
+    r3 = request.Request("GET", "http://host.com/", "", {"Accept": "*/*", "x-api-version": "2"})
+    assert api_headers(r1, r2) is None
+    with pytest.raises(AssertionError, match=r"'x-api-version': None\} != .*'x-api-version': '2'\}"):
+        api_headers(r1, r3)
+    assert api_headers.__name__ == "headers_subset(accept, x-api-version)"
+    assert api_headers.key(r1) == api_headers.key(r2) == ("*/*", None)
+    assert matchers.key_implies_match(api_headers)
+
+
 def test_query_matcher():
     req1 = request.Request("GET", "http://host.com/?a=b&c=d", "", {})
     req2 = request.Request("GET", "http://host.com/?c=d&a=b", "", {})
@@ -326,14 +383,213 @@ def test_get_matchers_results(r1, r2, expected_successes, expected_failures):
         assert failures[i][1] is not None
 
 
-@mock.patch("vcr.matchers.get_matchers_results")
+def test_get_matchers_results_stops_below_min_successes():
+    r1 = request.Request("GET", "http://host.com/p?a=b", "", {})
+    r2 = request.Request("POST", "http://host.com/x?a=b", "", {})
+    query = mock.Mock(wraps=matchers.query, __name__="query")
+    successes, failures = matchers.get_matchers_results(r1, r2, [matchers.method, matchers.path, query])
+    assert (successes, [name for name, _ in failures]) == (["query"], ["method", "path"])
+
+    successes, failures = matchers.get_matchers_results(
+        r1,
+        r2,
+        [matchers.method, matchers.path, query],
+        min_successes=2,
+    )
+    assert (successes, [name for name, _ in failures]) == ([], ["method", "path"])
+    assert query.call_count == 1
+
+
 @pytest.mark.parametrize(
-    "successes, failures, expected_match",
-    [(["method", "path"], [], True), (["method"], ["path"], False), ([], ["method", "path"], False)],
+    "r1, r2, expected_match",
+    [
+        (
+            request.Request("GET", "http://host.com/p?a=b", "", {}),
+            request.Request("GET", "http://host.com/p?a=b", "", {}),
+            True,
+        ),
+        (
+            request.Request("GET", "http://host.com/p?a=b", "", {}),
+            request.Request("GET", "http://host.com/x?a=b", "", {}),
+            False,
+        ),
+        (
+            request.Request("GET", "http://host.com/p?a=b", "", {}),
+            request.Request("POST", "http://host.com/x?a=b", "", {}),
+            False,
+        ),
+    ],
 )
-def test_requests_match(mock_get_matchers_results, successes, failures, expected_match):
-    mock_get_matchers_results.return_value = (successes, failures)
-    r1 = request.Request("GET", "http://host.com/p?a=b", "", {})
-    r2 = request.Request("GET", "http://host.com/p?a=b", "", {})
+def test_requests_match(r1, r2, expected_match):
     match = matchers.requests_match(r1, r2, [matchers.method, matchers.path])
     assert match is expected_match
+
+
+@pytest.mark.parametrize("debug_enabled", [True, False])
+def test_requests_match_only_builds_failure_details_when_logged(debug_enabled):
+    r1 = request.Request("GET", "http://host.com/p?a=b", "", {})
+    r2 = request.Request("POST", "http://host.com/p?a=b", "", {})
+    with (
+        mock.patch.object(matchers.log, "isEnabledFor", return_value=debug_enabled),
+        mock.patch("vcr.matchers.get_matchers_results", return_value=([], [])) as mock_get_matchers_results,
+    ):
+        assert matchers.requests_match(r1, r2, [matchers.method, matchers.path]) is False
+    assert mock_get_matchers_results.called is debug_enabled
+
+
+def test_matcher_chain_stops_at_first_failure():
+    first = mock.Mock(return_value=False)
+    second = mock.Mock(return_value=True)
+    chain = matchers.MatcherChain([first, second])
+    assert chain("r1", "r2") is False
+    assert not second.called
+
+    def assertion_matcher(r1, r2):
+        raise AssertionError("Failing matcher")
+
+    assert matchers.MatcherChain([second, assertion_matcher])("r1", "r2") is False
+    assert matchers.MatcherChain([second, lambda r1, r2: None])("r1", "r2") is True
+    assert matchers.MatcherChain()("r1", "r2") is True
+
+
+def test_matcher_chain_compares_keys_of_matchers_implying_a_match():
+    version = mock.Mock()
+    matchers.keyed(lambda request: request.headers.get("X-Version"), implies_match=True)(version)
+    chain = matchers.MatcherChain([version])
+    versioned_request = request.Request("GET", "http://host.com/", "", {"X-Version": "2"})
+    assert chain(REQUESTS["base"], REQUESTS["method"]) is True
+    assert chain(REQUESTS["base"], versioned_request) is False
+    assert not version.called
+
+
+def test_keyed_matcher():
+    @matchers.keyed(lambda request: request.headers.get("X-Version"), implies_match=True)
+    def version(r1, r2):
+        assert r1.headers.get("X-Version") == r2.headers.get("X-Version")
+
+    def unkeyed(r1, r2):
+        pass
+
+    versioned_request = request.Request("GET", "http://host.com/", "", {"X-Version": "2"})
+    assert matchers.get_key(version)(versioned_request) == "2"
+    assert matchers.key_implies_match(version)
+    assert matchers.get_key(unkeyed) is None
+    assert not matchers.key_implies_match(unkeyed)
+    assert not matchers.key_implies_match(mock.Mock())
+
+
+def test_builtin_matchers_keys():
+    for matcher_name in ("method", "scheme", "host", "port", "path", "query"):
+        matcher = getattr(matchers, matcher_name)
+        key = matchers.get_key(matcher)
+        assert matchers.key_implies_match(matcher)
+        for k1, k2 in itertools.permutations(REQUESTS, 2):
+            keys_equal = key(REQUESTS[k1]) == key(REQUESTS[k2])
+            assert keys_equal is (matcher_name not in {k1, k2})
+
+
+def test_adaptive_matcher_chain_runs_selective_matchers_first():
+    def never_rejects(r1, r2):
+        return True
+
+    def always_rejects(r1, r2):
+        return False
+
+    never_rejects_mock = mock.Mock(wraps=never_rejects, __name__="never_rejects")
+    chain = matchers.AdaptiveMatcherChain([never_rejects_mock, always_rejects])
+    chain.reorder_interval = 2
+    for _ in range(10):
+        assert chain("r1", "r2") is False
+
+    assert chain.order == (always_rejects, never_rejects_mock)
+    # Only the first call, before the chain was reordered, ran both matchers
+    assert never_rejects_mock.call_count == 1
+    report = chain.statistics.report(chain.order)
+    assert [(entry["matcher"], entry["evaluations"], entry["rejections"]) for entry in report] == [
+        ("always_rejects", 10, 10),
+        ("never_rejects", 1, 0),
+    ]
+
+
+def test_adaptive_matcher_chain_reports_the_order_it_runs_in():
+    def never_rejects(r1, r2):
+        return True
+
+    def always_rejects(r1, r2):
+        return False
+
+    chain = matchers.AdaptiveMatcherChain([never_rejects, always_rejects])
+    for _ in range(10):
+        chain("r1", "r2")
+    # The statistics favor always_rejects, but the chain hasn't been
+    # reordered yet
+    assert chain.statistics.score(always_rejects) < chain.statistics.score(never_rejects)
+    assert chain.order == (never_rejects, always_rejects)
+
+    with mock.patch.object(matchers.log, "debug") as debug:
+        chain._reorder()
+    debug.assert_not_called()
+    assert chain.order == (always_rejects, never_rejects)
+
+
+def test_adaptive_matcher_chain_gives_the_same_results():
+    chain = matchers.AdaptiveMatcherChain([matchers.method, matchers.path, matchers.query])
+    chain.reorder_interval = 1
+    for k1, k2 in itertools.product(REQUESTS, repeat=2):
+        expected = matchers.MatcherChain(chain)(REQUESTS[k1], REQUESTS[k2])
+        assert chain(REQUESTS[k1], REQUESTS[k2]) is expected
+
+
+def test_body_matcher_caches_transformations():
+    headers = {"Content-Type": "application/json"}
+    r1 = request.Request("POST", "http://host.com/", '{"a": 1, "b": 2}', headers)
+    r2 = request.Request("POST", "http://host.com/", '{"b": 2, "a": 1}', headers)
+    with mock.patch("vcr.matchers.json.loads", wraps=matchers.json.loads) as loads:
+        assert matchers.body(r1, r2) is None
+        assert matchers.body(r1, r2) is None
+        assert loads.call_count == 2
+
+        r2.body = '{"b": 2, "a": 2}'
+        with pytest.raises(AssertionError):
+            matchers.body(r1, r2)
+        assert loads.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "body, expected",
+    [
+        (b"5\r\n12345\r\n2\r\n67\r\n0\r\n\r\n", b"1234567"),
+        (b"a\r\n0123456789\r\n0\r\n\r\n", b"0123456789"),
+        (b"not chunked\r\n", b"not chunked\r\n"),
+        (b"123", b"123"),
+    ],
+)
+def test_dechunk(body, expected):
+    assert matchers._dechunk(body) == expected
+
+
+@pytest.mark.parametrize("body", [b"5\r\n12345\r\nzz\r\n", b"5\r\n1234\r\n0\r\n\r\n", b"5\r\n12345\r\n"])
+def test_dechunk_malformed(body):
+    with pytest.raises(ValueError, match="Malformed chunked data"):
+        matchers._dechunk(body)
+
+
+def test_query_of_request_like_objects():
+    r1 = SimpleNamespace(query=[("a", "1")])
+    r2 = SimpleNamespace(query=[("a", "1")])
+    assert matchers.query(r1, r2) is None
+    assert matchers.query.key(r1) == matchers.query.key(
+        request.Request("GET", "http://host.com/?a=1", "", {}),
+    )
+    with pytest.raises(AssertionError):
+        matchers.query(r1, SimpleNamespace(query=[("a", "2")]))
+
+
+def test_fingerprint_fields():
+    custom = matchers.headers_subset(["Accept"])
+    assert matchers.fingerprint_fields([matchers.uri, custom, matchers.method, matchers.uri]) == (
+        "method",
+        "uri",
+    )
+    assert matchers.fingerprint_fields([matchers.body_digest, matchers.query]) == ("query", "body")
+    assert matchers.fingerprint_fields([custom]) == request.FINGERPRINT_FIELDS
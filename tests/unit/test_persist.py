@@ -1,6 +1,9 @@
+from unittest import mock
+
 import pytest
 
 from vcr.persisters.filesystem import FilesystemPersister
+from vcr.request import Request
 from vcr.serializers import jsonserializer, yamlserializer
 
 
@@ -28,3 +31,69 @@ def test_load_cassette_with_invalid_cassettes(cassette_path, serializer):
     with pytest.raises(Exception) as excinfo:
         FilesystemPersister.load_cassette(cassette_path, serializer)
     assert "run the migration script" not in excinfo.exconly()
+
+
+def test_save_cassette_keeps_the_cassette_on_error(tmpdir):
+    cassette_path = tmpdir.join("cassette.json")
+    cassette_path.write("previous cassette")
+    cassette_dict = {
+        "requests": [Request("GET", "http://localhost/", None, {})] * 2,
+        "responses": [{"body": {"string": "ok"}}, {"body": {"string": object()}}],
+    }
+    with pytest.raises(TypeError):
+        FilesystemPersister.save_cassette(str(cassette_path), cassette_dict, jsonserializer)
+    assert cassette_path.read() == "previous cassette"
+    assert tmpdir.listdir() == [cassette_path]
+
+    cassette_dict["responses"].pop()
+    FilesystemPersister.save_cassette(str(cassette_path), cassette_dict, jsonserializer)
+    _, responses = FilesystemPersister.load_cassette(str(cassette_path), jsonserializer)
+    assert responses == [{"body": {"string": b"ok"}}]
+
+
+def test_load_cassette_through_the_cache(tmpdir):
+    cassette_path = tmpdir.join("cassette.yaml")
+    cache_dir = tmpdir.join(".vcr_cache")
+    persister = FilesystemPersister.with_cache_dir(str(cache_dir))
+    cassette_dict = {
+        "requests": [Request("GET", "http://localhost/", None, {})],
+        "responses": [{"status": {"code": 200, "message": "OK"}, "headers": {}, "body": {"string": b"ok"}}],
+    }
+    persister.save_cassette(str(cassette_path), cassette_dict, yamlserializer)
+
+    serializer = mock.Mock(wraps=yamlserializer, spec=["serialize", "deserialize"])
+    for _ in range(2):
+        requests, responses = persister.load_cassette(str(cassette_path), serializer)
+        assert requests[0].uri == "http://localhost/"
+        assert responses[0]["body"]["string"] == b"ok"
+    # The second load read the cached data
+    assert serializer.deserialize.call_count == 1
+    assert len(cache_dir.listdir()) == 1
+
+    # A modified cassette is parsed again
+    cassette_path.write(cassette_path.read().replace("localhost", "otherhost"))
+    requests, _ = persister.load_cassette(str(cassette_path), serializer)
+    assert requests[0].uri == "http://otherhost/"
+    assert serializer.deserialize.call_count == 2
+
+    # So is one whose cache entry is broken
+    cache_dir.listdir()[0].write_binary(b"VCRB\x01m")
+    requests, _ = persister.load_cassette(str(cassette_path), serializer)
+    assert requests[0].uri == "http://otherhost/"
+    assert serializer.deserialize.call_count == 3
+    requests, _ = persister.load_cassette(str(cassette_path), serializer)
+    assert serializer.deserialize.call_count == 3
+
+
+def test_load_cassette_with_uncachable_data(tmpdir):
+    cassette_path = tmpdir.join("cassette.json")
+    cassette_path.write("{}")
+    cache_dir = tmpdir.join(".vcr_cache")
+    serializer = mock.Mock(spec=["serialize", "deserialize"])
+    serializer.deserialize.return_value = {"interactions": [], "set": {1}}
+    persister = FilesystemPersister.with_cache_dir(str(cache_dir))
+    for _ in range(2):
+        persister.load_cassette(str(cassette_path), serializer)
+    assert serializer.deserialize.call_count == 2
+    assert not cache_dir.check() or not cache_dir.listdir()
+    assert FilesystemPersister.with_cache_dir(None) is FilesystemPersister
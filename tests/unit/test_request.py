@@ -1,5 +1,9 @@
+import copy
+import pickle
+
 import pytest
 
+from vcr import matchers
 from vcr.request import HeadersDict, Request
 
 
@@ -60,6 +64,74 @@ def test_uri(method, uri):
     assert Request(method, uri, "", {}).uri == uri
 
 
+def test_uri_components_follow_uri():
+    req = Request("GET", "https://Go.com/?b=2&a=1", "", {})
+    assert (req.host, req.port, req.query) == ("go.com", 443, [("a", "1"), ("b", "2")])
+
+    req.query.append(("c", "3"))
+    assert req.query == [("a", "1"), ("b", "2")]
+
+    req.uri = "http://other.com:8080/?c=3"
+    assert (req.host, req.port, req.query) == ("other.com", 8080, [("c", "3")])
+
+
+def test_compact_request():
+    req = Request("GET", "http://go.com/", "", {"Content-Type": ["text/plain"], "content-type": "text/html"})
+    assert not hasattr(req, "__dict__")
+    assert req._to_dict()["headers"] == {"Content-Type": ["text/html"]}
+    assert req._headers is None
+
+    req.headers["Accept"] = "*/*"
+    assert req._to_dict()["headers"] == {"Content-Type": ["text/html"], "Accept": ["*/*"]}
+
+
+def test_copy_and_pickle_request():
+    req = Request("POST", "http://go.com/?a=1", b"body", {"Accept": "*/*"})
+    assert req.query == [("a", "1")]
+    for other in (copy.deepcopy(req), pickle.loads(pickle.dumps(req))):
+        assert other._to_dict() == req._to_dict()
+        assert other.query == req.query
+        other.uri = "http://go.com/?b=2"
+        assert other.query == [("b", "2")]
+        assert req.query == [("a", "1")]
+
+
+def test_pickle_request_compared_on_body():
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    req = Request("POST", "http://go.com/", b"a=1&b=2", headers)
+    matchers.body(req, Request("POST", "http://go.com/", b"b=2&a=1", headers))
+    assert req._transformed_bodies
+
+    other = pickle.loads(pickle.dumps(req))
+    assert other._transformed_bodies is None
+    assert other._to_dict() == req._to_dict()
+    assert matchers.body(other, req) is None
+
+
+def test_fingerprint():
+    req = Request("POST", "http://go.com/", iter([b"bo", b"dy"]), {})
+    other = Request("POST", "http://go.com/", b"body", {"Accept": "*/*"})
+    assert req.fingerprint() == other.fingerprint()
+    assert req.fingerprint(["method", "path"]) != req.fingerprint()
+
+    other.body = b"other"
+    assert req.fingerprint() != other.fingerprint()
+    assert req.fingerprint(["method", "path"]) == other.fingerprint(["method", "path"])
+
+    copied = copy.copy(req)
+    copied.method = "GET"
+    assert req.fingerprint() != copied.fingerprint()
+    assert req.fingerprint(["uri"]) == copied.fingerprint(["uri"])
+
+    with pytest.raises(ValueError):
+        req.fingerprint(["headers"])
+
+
+def test_fingerprint_tells_types_apart():
+    no_body = Request("GET", "http://go.com/", None, {})
+    assert no_body.fingerprint() != Request("GET", "http://go.com/", b"None", {}).fingerprint()
+
+
 def test_HeadersDict():
     # Simple test of CaseInsensitiveDict
     h = HeadersDict()
@@ -84,3 +156,34 @@ def test_HeadersDict():
     assert h == {"Content-Type": "text/plain"}
     h["CONtent-tyPE"] = "whoa"
     assert h == {"Content-Type": "whoa"}
+
+
+def test_copy_on_write_request():
+    req = Request("POST", "http://go.com/", b"body", {"Accept": "*/*"})
+    req.headers["Accept"] = "text/plain"
+
+    other = copy.copy(req)
+    assert other.body is req.body
+    other.headers["Accept"] = "text/html"
+    other.body = b"other"
+    assert req.headers == {"Accept": "text/plain"}
+    assert req.body == b"body"
+
+    req = Request("POST", "http://go.com/", {"a": "b"}, {})
+    other = copy.copy(req)
+    other.body["a"] = "c"
+    assert req.body == {"a": "b"}
+
+
+def test_HeadersDict_frozen_lower_items():
+    h = HeadersDict({"Content-Type": "application/json", "Accept": "*/*"})
+    frozen = h.frozen_lower_items()
+    assert frozen == {("content-type", "application/json"), ("accept", "*/*")}
+    assert h.frozen_lower_items() is frozen
+    assert h == HeadersDict({"accept": "*/*", "CONTENT-TYPE": "application/json"})
+
+    h["accept"] = "text/html"
+    assert ("accept", "text/html") in h.frozen_lower_items()
+    del h["Accept"]
+    assert h.frozen_lower_items() == {("content-type", "application/json")}
+    assert h != HeadersDict({"Content-Type": "application/json", "Accept": "*/*"})
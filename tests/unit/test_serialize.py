@@ -1,10 +1,11 @@
+import warnings
 from unittest import mock
 
 import pytest
 
 from vcr.request import Request
-from vcr.serialize import deserialize, serialize
-from vcr.serializers import compat, jsonserializer, yamlserializer
+from vcr.serialize import deserialize, serialize, serialize_to
+from vcr.serializers import binaryserializer, compat, jsonserializer, yamlserializer
 
 
 def test_deserialize_old_yaml_cassette():
@@ -162,3 +163,143 @@ def test_deserialize_no_body_string():
     data = {"body": {"string": None}}
     output = compat.convert_to_bytes(data)
     assert data == output
+
+
+@pytest.mark.parametrize("serializer", [jsonserializer, yamlserializer])
+def test_serialize_fingerprints(serializer):
+    request = Request(method="POST", uri="http://localhost/", body=b"body", headers={})
+    response = {"status": {"code": 200, "message": "OK"}, "headers": {}, "body": {"string": b""}}
+    cassette_string = serialize(
+        {"requests": [request], "responses": [response], "fingerprints": [request.fingerprint()]},
+        serializer,
+    )
+    assert serializer.deserialize(cassette_string)["interactions"][0]["fingerprint"] == request.fingerprint()
+
+    requests, _ = deserialize(cassette_string, serializer)
+    assert requests[0].fingerprint() == request.fingerprint()
+
+    with pytest.warns(UserWarning, match="doesn't match the fingerprint"):
+        deserialize(cassette_string.replace("localhost", "otherhost"), serializer)
+
+
+def test_serialize_fingerprint_fields():
+    request = Request(method="POST", uri="http://localhost/", body=b"body", headers={})
+    response = {"status": {"code": 200, "message": "OK"}, "headers": {}, "body": {"string": b""}}
+    fields = ["method", "path"]
+    cassette_string = serialize(
+        {
+            "requests": [request],
+            "responses": [response],
+            "fingerprint_fields": fields,
+            "fingerprints": [request.fingerprint(fields)],
+        },
+        jsonserializer,
+    )
+    assert jsonserializer.deserialize(cassette_string)["fingerprint_fields"] == fields
+
+    # The fingerprints are verified against the fields they cover
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        loaded_cassette = deserialize(cassette_string.replace("localhost", "otherhost"), jsonserializer)
+    assert loaded_cassette.fingerprint_fields == ("method", "path")
+    with pytest.warns(UserWarning, match="doesn't match the fingerprint"):
+        deserialize(cassette_string.replace("POST", "PUT"), jsonserializer)
+
+
+def test_deserialize_shares_headers():
+    interaction = {
+        "request": {
+            "method": "GET",
+            "uri": "http://localhost/",
+            "body": None,
+            "headers": {"Accept": ["*/*"]},
+        },
+        "response": {
+            "status": {"code": 200, "message": "OK"},
+            "headers": {"Content-Type": ["text/html; charset=utf-8"], "Server": ["nginx"]},
+            "body": {"string": ""},
+        },
+    }
+    cassette_string = jsonserializer.serialize({"version": 1, "interactions": [interaction, interaction]})
+    (request1, request2), (response1, response2) = deserialize(cassette_string, jsonserializer)
+    assert response1["headers"]["Content-Type"] is response2["headers"]["Content-Type"]
+    assert list(response1["headers"])[1] is list(response2["headers"])[1]
+    assert request1.headers["accept"] is request2.headers["accept"]
+    assert response1["headers"] == interaction["response"]["headers"]
+
+    # The shared values are written in full, not as YAML aliases
+    yaml_string = serialize(
+        {"requests": [request1, request2], "responses": [response1, response2]},
+        yamlserializer,
+    )
+    assert "&id" not in yaml_string
+    assert yaml_string.count("text/html; charset=utf-8") == 2
+
+
+def test_deserialize_lazy():
+    request = Request(method="POST", uri="http://localhost/", body=b"body", headers={})
+    response = {"status": {"code": 200, "message": "OK"}, "headers": {}, "body": {"string": b"response"}}
+    cassette_string = serialize(
+        {
+            "requests": [request, request],
+            "responses": [response, response],
+            "fingerprints": [request.fingerprint()] * 2,
+        },
+        jsonserializer,
+    )
+    loaded_cassette = deserialize(
+        cassette_string.replace("localhost", "otherhost", 1),
+        jsonserializer,
+        lazy=True,
+    )
+    requests, responses = loaded_cassette
+    first, second = loaded_cassette.interactions
+    assert len(requests) == len(responses) == 2
+    assert first._request is first._response is None
+
+    with pytest.warns(UserWarning, match="doesn't match the fingerprint"):
+        assert requests[0].uri == "http://otherhost/"
+    assert first._response is None
+    assert responses[1]["body"]["string"] == b"response"
+    assert second._request is None
+    assert first[0] is requests[0]
+    assert second == (second.request, responses[1])
+
+
+@pytest.mark.parametrize("serializer", [jsonserializer, yamlserializer, binaryserializer])
+def test_serialize_to(serializer):
+    requests = [
+        Request(method="GET", uri="http://localhost/", body=None, headers={"Accept": "*/*"}),
+        Request(method="POST", uri="http://localhost/upload", body="caf\xe9\n" * 50, headers={}),
+    ]
+    responses = [
+        {
+            "status": {"code": 200, "message": "OK"},
+            "headers": {"Server": ["nginx"]},
+            "body": {"string": b"hi"},
+        },
+        {"status": {"code": 201, "message": "Created"}, "headers": {}, "body": {"string": b""}},
+    ]
+    for cassette_dict in (
+        {"requests": [], "responses": []},
+        {"requests": requests, "responses": responses},
+        {
+            "requests": requests,
+            "responses": responses,
+            "fingerprints": [request.fingerprint() for request in requests],
+            "filter_fingerprint": "fingerprint",
+        },
+    ):
+        chunks = []
+        serialize_to(cassette_dict, serializer, chunks.append)
+        # One chunk per interaction at least, holding the same cassette
+        assert len(chunks) > len(cassette_dict["requests"])
+        assert chunks[0][:0].join(chunks) == serialize(cassette_dict, serializer)
+
+
+def test_serialize_to_without_streaming_support():
+    serializer = mock.Mock(spec=["serialize", "deserialize"])
+    serializer.serialize.return_value = "cassette"
+    write = mock.Mock()
+    serialize_to({"requests": [], "responses": []}, serializer, write)
+    write.assert_called_once_with("cassette")
@@ -18,7 +18,7 @@ class TestVCRConnection:
         assert vcr_connection.real_connection.ssl_version == "example_ssl_version"
 
     @mark.online
-    @mock.patch("vcr.cassette.Cassette.can_play_response_for", return_value=False)
+    @mock.patch("vcr.cassette.Cassette.lookup", return_value=mock.Mock(can_play=False))
     def testing_connect(*args):
         with contextlib.closing(VCRHTTPSConnection("www.google.com")) as vcr_connection:
             vcr_connection.cassette = Cassette("test", record_mode=mode.ALL)
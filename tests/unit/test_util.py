@@ -1,9 +1,11 @@
+import timeit
+from collections.abc import Mapping
 from io import BytesIO, StringIO
 
 import pytest
 
 from vcr import request
-from vcr.util import read_body
+from vcr.util import CaseInsensitiveDict, read_body
 
 
 @pytest.mark.parametrize(
@@ -31,3 +33,42 @@ def test_unsupported_read_body():
     with pytest.raises(ValueError) as excinfo:
         assert read_body(r)
     assert excinfo.value.args == ("Body type <class 'list'> not supported",)
+
+
+@pytest.mark.parametrize("input_", [BytesIO(b"Stream"), iter([b"Bytes", b"Iter"]), b"Bytes"])
+def test_read_body_without_copy(input_):
+    r = request.Request("POST", "http://host.com/", input_, {})
+    assert read_body(r) is read_body(r)
+
+
+def test_CaseInsensitiveDict_copy_on_write():
+    original = CaseInsensitiveDict({"Accept": "*/*", "Content-Type": "text/plain"})
+    copied = original.copy()
+    assert copied == original
+
+    copied["accept"] = "text/html"
+    del copied["content-type"]
+    assert original == {"Accept": "*/*", "Content-Type": "text/plain"}
+    assert copied == {"accept": "text/html"}
+
+    original["X-New"] = "1"
+    assert "x-new" not in copied
+    assert original.get("X-NEW") == "1"
+    assert original.get("missing", "default") == "default"
+
+
+def test_CaseInsensitiveDict_benchmark():
+    headers = CaseInsensitiveDict({f"X-Header-{i}": str(i) for i in range(50)})
+
+    def timing(statement):
+        return min(timeit.repeat(statement, number=2000, repeat=5))
+
+    # The copy used to rebuild the whole dict, and get() to raise KeyError
+    # for missing keys.
+    rebuilt_copy = timing(lambda: CaseInsensitiveDict(headers._store.values()))
+    shared_copy = timing(headers.copy)
+    mapping_get = timing(lambda: Mapping.get(headers, "Content-Type"))
+    direct_get = timing(lambda: headers.get("Content-Type"))
+
+    assert shared_copy < rebuilt_copy
+    assert direct_get < mapping_get
@@ -346,6 +346,58 @@ def test_additional_matchers():
     function_additional()
 
 
+def test_filter_fingerprint():
+    def fingerprint(**kwargs):
+        return VCR(**kwargs).get_merged_config()["filter_fingerprint"]
+
+    assert fingerprint() == fingerprint()
+    assert fingerprint(filter_headers=["authorization"]) == fingerprint(filter_headers=["authorization"])
+    assert fingerprint(filter_headers=["authorization"]) != fingerprint(filter_headers=["cookie"])
+    assert fingerprint(ignore_hosts=["a", "b"]) == fingerprint(ignore_hosts=["b", "a"])
+    assert fingerprint(ignore_localhost=True) != fingerprint()
+    assert fingerprint(decode_compressed_response=True) != fingerprint()
+    assert fingerprint(digest_request_bodies_over=1024) != fingerprint()
+
+    def filter_request(request):
+        return request
+
+    def other_filter_request(request):
+        return None
+
+    assert fingerprint(before_record=filter_request) == fingerprint(before_record=filter_request)
+    assert fingerprint(before_record=filter_request) != fingerprint(before_record=other_filter_request)
+
+    # Filters whose bytecode only differs by the attributes or globals it uses
+    def lower_uri(request):
+        request.uri = request.uri.lower()
+        return request
+
+    def upper_uri(request):
+        request.uri = request.uri.upper()
+        return request
+
+    def call_str(request):
+        return str(request)
+
+    def call_repr(request):
+        return repr(request)
+
+    lower_uri.__qualname__ = upper_uri.__qualname__
+    call_str.__qualname__ = call_repr.__qualname__
+    assert fingerprint(before_record=lower_uri) != fingerprint(before_record=upper_uri)
+    assert fingerprint(before_record=call_str) != fingerprint(before_record=call_repr)
+
+    def make_filter(secret):
+        return lambda request: request if secret else None
+
+    assert fingerprint(before_record_response=make_filter("a")) == fingerprint(
+        before_record_response=make_filter("a"),
+    )
+    assert fingerprint(before_record_response=make_filter("a")) != fingerprint(
+        before_record_response=make_filter(""),
+    )
+
+
 def test_decoration_should_respect_function_return_value():
     vcr = VCR()
     ret = "a-return-value"
@@ -404,3 +456,19 @@ def test_use_cassette_generator_return():
         next(gen())
 
     assert exc_info.value.value is ret_val
+
+
+def test_digest_request_bodies_over():
+    vcr = VCR(digest_request_bodies_over=4)
+    with vcr.use_cassette("test") as cassette:
+        request = Request("PUT", "http://example.com/", b"12345", {})
+        assert cassette.filter_request(request).body.endswith(b";length=5")
+        request = Request("PUT", "http://example.com/", b"1234", {})
+        assert cassette.filter_request(request).body == b"1234"
+
+
+def test_cassette_cache_dir(tmpdir):
+    cache_dir = str(tmpdir.join(".vcr_cache"))
+    with VCR(cassette_cache_dir=cache_dir).use_cassette(str(tmpdir.join("cassette.yaml"))) as cassette:
+        assert cassette._persister.cache_dir == cache_dir
+    assert VCR().persister.cache_dir is None
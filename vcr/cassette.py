@@ -1,6 +1,7 @@
 import collections
 import contextlib
 import copy
+import heapq
 import inspect
 import logging
 from inspect import iscoroutinefunction
@@ -9,7 +10,18 @@ import wrapt
 
 from ._handle_coroutine import handle_coroutine
 from .errors import UnhandledHTTPRequestError
-from .matchers import get_matchers_results, method, requests_match, uri
+from .matchers import (
+    AdaptiveMatcherChain,
+    MatcherChain,
+    MatcherStatistics,
+    fingerprint_fields,
+    get_key,
+    get_matchers_results,
+    key_implies_match,
+    method,
+    requests_match,
+    uri,
+)
 from .patch import CassettePatcherBuilder
 from .persisters.filesystem import CassetteDecodeError, CassetteNotFoundError, FilesystemPersister
 from .record_mode import RecordMode
@@ -147,6 +159,45 @@ class CassetteContextDecorator:
         return new_args_getter
 
 
+class _Interactions(list):
+    """
+    The list of the interactions of a cassette. It counts the changes made to
+    it other than appending interactions, after which the index of the
+    cassette has to be rebuilt.
+    """
+
+    __slots__ = ("changes",)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.changes = 0
+
+
+def _counting_changes(name):
+    method = getattr(list, name)
+
+    def counting_changes(self, *args, **kwargs):
+        self.changes += 1
+        return method(self, *args, **kwargs)
+
+    counting_changes.__name__ = name
+    return counting_changes
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__imul__",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(_Interactions, _name, _counting_changes(_name))
+
+
 class Cassette:
     """A container for recorded requests and responses"""
 
@@ -178,11 +229,16 @@ class Cassette:
         inject=False,
         allow_playback_repeats=False,
         drop_unused_requests=False,
+        filter_fingerprint=None,
+        refilter_on_load=False,
+        adaptive_match_order=False,
+        record_fingerprints=False,
+        lazy_load=False,
     ):
         self._persister = persister or FilesystemPersister
         self._path = path
         self._serializer = serializer or yamlserializer
-        self._match_on = match_on
+        self._match_on = match_on if isinstance(match_on, MatcherChain) else MatcherChain(match_on)
         self._before_record_request = before_record_request or (lambda x: x)
         log.info(self._before_record_request)
         self._before_record_response = before_record_response or (lambda x: x)
@@ -191,9 +247,16 @@ class Cassette:
         self.custom_patches = custom_patches
         self.allow_playback_repeats = allow_playback_repeats
         self.drop_unused_requests = drop_unused_requests
-
-        # self.data is the list of (req, resp) tuples
-        self.data = []
+        self._filter_fingerprint = filter_fingerprint
+        self.refilter_on_load = refilter_on_load
+        self.record_fingerprints = record_fingerprints
+        # The fingerprints cover the fields compared by the matchers
+        self._fingerprint_fields = fingerprint_fields(match_on) if record_fingerprints else None
+        self.lazy_load = lazy_load
+
+        # self.data is the list of (req, resp) tuples, or LazyInteraction
+        # pairs for the interactions loaded with lazy_load
+        self._data = _Interactions()
         self.play_counts = collections.Counter()
         self.dirty = False
         self.rewound = False
@@ -201,6 +264,59 @@ class Cassette:
         # Subsets of self.data to store old and played interactions
         self._old_interactions = []
         self._played_interactions = []
+        # The interactions of self.data before this index were loaded from
+        # the cassette, the others were recorded since.
+        self._loaded_count = 0
+        # The interactions of self.data before this index are the ones of
+        # the saved cassette, the others can be appended to it as long as
+        # self.data had no other changes since, see _Interactions.
+        self._saved_count = 0
+        self._saved_changes = 0
+
+        # Index of self.data, bucketing the interactions on the key projections
+        # of the matchers that have one, so that a lookup only has to run the
+        # matchers against the interactions of a single bucket. Matchers whose
+        # key implies a match don't need to run on the bucket at all.
+        self._key_functions = tuple(get_key(matcher) for matcher in match_on if get_key(matcher))
+        self._post_filters = MatcherChain(matcher for matcher in match_on if not key_implies_match(matcher))
+        if adaptive_match_order:
+            statistics = MatcherStatistics()
+            self._match_on = AdaptiveMatcherChain(self._match_on, statistics)
+            self._post_filters = AdaptiveMatcherChain(self._post_filters, statistics)
+        self._index = collections.defaultdict(list)
+        self._unindexed = []
+        self._indexed_count = 0
+        # The list indexed and its changes count, see _Interactions
+        self._indexed_data = self._data
+        self._indexed_changes = 0
+        # The bucket key of each indexed interaction, and, for each bucket,
+        # the FIFO of the interactions that haven't been played yet.
+        self._keys = []
+        self._unplayed = collections.defaultdict(collections.deque)
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        # A copy, which tracks the changes made to it
+        self._data = _Interactions(data)
+        # The saved cassette has to be rewritten
+        self._saved_count = 0
+
+    @property
+    def matcher_statistics(self):
+        """
+        With adaptive_match_order, the evaluations, rejections and time spent
+        of each matcher run by lookups, in the order they currently run in.
+        None otherwise. When the matchers index the interactions, lookups
+        only run the matchers left once the index found the candidates.
+        """
+        if not isinstance(self._match_on, AdaptiveMatcherChain):
+            return None
+        chain = self._post_filters if self._key_functions else self._match_on
+        return chain.statistics.report(chain.order)
 
     @property
     def play_count(self):
@@ -213,11 +329,11 @@ class Cassette:
 
     @property
     def requests(self):
-        return [request for (request, response) in self.data]
+        return [interaction[0] for interaction in self.data]
 
     @property
     def responses(self):
-        return [response for (request, response) in self.data]
+        return [interaction[1] for interaction in self.data]
 
     @property
     def write_protected(self):
@@ -241,31 +357,152 @@ class Cassette:
     def filter_request(self, request):
         return self._before_record_request(request)
 
+    def _index_key(self, request):
+        """
+        internal API, returns the key of the index bucket of a request, or
+        None if it can't be computed (e.g. the request isn't a Request).
+        """
+        try:
+            key = tuple(key_function(request) for key_function in self._key_functions)
+            hash(key)
+        except (AttributeError, TypeError, ValueError):
+            return None
+        return key
+
+    def _update_index(self):
+        """
+        internal API, adds the interactions appended to self.data since the
+        last call to the index.
+        """
+        data = self._data
+        if data is not self._indexed_data or data.changes != self._indexed_changes:
+            # self.data has been replaced or changed in place, start over
+            self._indexed_data = data
+            self._indexed_changes = data.changes
+            self._index.clear()
+            self._unindexed = []
+            self._keys = []
+            self._unplayed.clear()
+            self._indexed_count = 0
+        for index in range(self._indexed_count, len(self.data)):
+            key = self._index_key(self.data[index][0])
+            self._keys.append(key)
+            if key is None:
+                self._unindexed.append(index)
+            else:
+                self._index[key].append(index)
+                if self.play_counts[index] == 0:
+                    self._unplayed[key].append(index)
+        self._indexed_count = len(self.data)
+
+    def _unplayed_of_bucket(self, key):
+        """
+        internal API, returns the FIFO of the unplayed interactions of a
+        bucket, without the ones marked as played behind our back.
+        """
+        unplayed = self._unplayed.get(key)
+        if unplayed is None:
+            return ()
+        while unplayed and self.play_counts[unplayed[0]] != 0:
+            unplayed.popleft()
+        return unplayed
+
+    def _candidates(self, request, unplayed=False):
+        """
+        internal API, returns an iterator, in recording order, with the indexes
+        of the interactions that may match the (filtered) request, along with
+        the matchers that still have to be run against them. If unplayed is
+        true, only the interactions that haven't been played are returned.
+        """
+        self._update_index()
+        key = self._index_key(request)
+        if key is None:
+            indexes = range(len(self.data))
+            if unplayed:
+                indexes = (index for index in indexes if self.play_counts[index] == 0)
+            return ((index, self._match_on) for index in indexes)
+
+        bucket = self._unplayed_of_bucket(key) if unplayed else self._index.get(key, ())
+        if not self._unindexed:
+            return ((index, self._post_filters) for index in bucket)
+        unindexed = self._unindexed
+        if unplayed:
+            unindexed = (index for index in unindexed if self.play_counts[index] == 0)
+        return heapq.merge(
+            ((index, self._post_filters) for index in bucket),
+            ((index, self._match_on) for index in unindexed),
+            key=lambda candidate: candidate[0],
+        )
+
+    def _matches(self, request, unplayed=False):
+        """
+        internal API, returns an iterator with the indexes of all the
+        interactions matching the already filtered request.
+        """
+        for index, matchers in self._candidates(request, unplayed):
+            # Only the request, the response may not have been built yet
+            stored_request = self.data[index][0]
+            if not matchers or requests_match(request, stored_request, matchers):
+                yield index
+
     def _responses(self, request):
         """
         internal API, returns an iterator with all responses matching
         the request.
         """
-        request = self._before_record_request(request)
-        for index, (stored_request, response) in enumerate(self.data):
-            if requests_match(request, stored_request, self._match_on):
-                yield index, response
+        for index in self._matches(self._before_record_request(request)):
+            yield self.data[index][1]
+
+    def _first_playable(self, request):
+        """
+        internal API, returns the index of the first interaction matching the
+        already filtered request whose response can be played, or None.
+        """
+        for index in self._matches(request, unplayed=not self.allow_playback_repeats):
+            return index
+        return None
+
+    def _play(self, index):
+        """
+        internal API, marks the interaction at index as played and returns
+        its response.
+        """
+        self.play_counts[index] += 1
+        key = self._keys[index]
+        if key is not None:
+            unplayed = self._unplayed[key]
+            if unplayed and unplayed[0] == index:
+                unplayed.popleft()
+            elif index in unplayed:
+                unplayed.remove(index)
+        stored_request, response = self.data[index]
+        # Use stored (possibly modified) request, not the raw incoming request
+        self._played_interactions.append((stored_request, response))
+        return response
+
+    def lookup(self, request):
+        """
+        Filter a request and find the response to play for it, if any, in a
+        single pass. Returns a Playback, which the stubs use both to know
+        whether a response can be played and to play it.
+        """
+        filtered_request = self._before_record_request(request)
+        index = None
+        if filtered_request and self.record_mode != RecordMode.ALL and self.rewound:
+            index = self._first_playable(filtered_request)
+        return Playback(self, request, filtered_request, index)
 
     def can_play_response_for(self, request):
-        request = self._before_record_request(request)
-        return request and request in self and self.record_mode != RecordMode.ALL and self.rewound
+        return self.lookup(request).can_play
 
     def play_response(self, request):
         """
         Get the response corresponding to a request, but only if it
         hasn't been played back before, and mark it as played
         """
-        for index, response in self._responses(request):
-            if self.play_counts[index] == 0 or self.allow_playback_repeats:
-                self.play_counts[index] += 1
-                # Use stored (possibly modified) request, not the raw incoming request
-                self._played_interactions.append((self.data[index][0], response))
-                return response
+        index = self._first_playable(self._before_record_request(request))
+        if index is not None:
+            return self._play(index)
         # The cassette doesn't contain the request asked for.
         raise UnhandledHTTPRequestError(
             f"The cassette ({self._path!r}) doesn't contain the request ({request!r}) asked for",
@@ -277,7 +514,7 @@ class Cassette:
         This function isn't actually used by VCR internally, but is
         provided as an external API.
         """
-        responses = [response for index, response in self._responses(request)]
+        responses = list(self._responses(request))
 
         if responses:
             return responses
@@ -288,8 +525,11 @@ class Cassette:
 
     def rewind(self):
         self.play_counts = collections.Counter()
+        self._unplayed.clear()
+        for key, indexes in self._index.items():
+            self._unplayed[key].extend(indexes)
 
-    def find_requests_with_most_matches(self, request):
+    def find_requests_with_most_matches(self, request, limit=None):
         """
         Get the most similar request(s) stored in the cassette
         of a given request as a list of tuples like this:
@@ -299,70 +539,154 @@ class Cassette:
 
         This is useful when a request failed to be found,
         we can get the similar request(s) in order to know what have changed in the request parts.
+
+        If limit is given, only the first limit most similar requests are returned.
         """
         best_matches = []
+        # Do not keep matches that have 0 successes,
+        # it means that the request is totally different from
+        # the ones stored in the cassette
+        best_nb_success = 1
         request = self._before_record_request(request)
-        for _, (stored_request, _) in enumerate(self.data):
-            successes, fails = get_matchers_results(request, stored_request, self._match_on)
-            best_matches.append((len(successes), stored_request, successes, fails))
-        best_matches.sort(key=lambda t: t[0], reverse=True)
-        # Get the first best matches (multiple if equal matches)
-        final_best_matches = []
-
-        if not best_matches:
-            return final_best_matches
-
-        previous_nb_success = best_matches[0][0]
-        for best_match in best_matches:
-            nb_success = best_match[0]
-            # Do not keep matches that have 0 successes,
-            # it means that the request is totally different from
-            # the ones stored in the cassette
-            if nb_success < 1 or previous_nb_success != nb_success:
+        for interaction in self.data:
+            stored_request = interaction[0]
+            successes, fails = get_matchers_results(
+                request,
+                stored_request,
+                self._match_on,
+                min_successes=best_nb_success,
+            )
+            nb_success = len(successes)
+            if nb_success < best_nb_success:
+                continue
+            if nb_success > best_nb_success:
+                best_nb_success = nb_success
+                best_matches = []
+            if limit is None or len(best_matches) < limit:
+                best_matches.append((stored_request, successes, fails))
+            elif best_nb_success == len(self._match_on):
+                # No request can be more similar than these ones
                 break
-            previous_nb_success = nb_success
-            final_best_matches.append(best_match[1:])
-
-        return final_best_matches
+        return best_matches
 
     def _new_interactions(self):
         """List of new HTTP interactions (request/response tuples)"""
-        new_interactions = []
-        for request, response in self.data:
-            if all(
-                not requests_match(request, old_request, self._match_on)
-                for old_request, _ in self._old_interactions
-            ):
-                new_interactions.append((request, response))
-        return new_interactions
+        return [
+            (request, response)
+            for request, response in self.data[self._loaded_count :]
+            if not self._matches_loaded_interaction(request)
+        ]
+
+    def _matches_loaded_interaction(self, request):
+        """
+        internal API, returns whether the already filtered request matches one
+        of the interactions loaded from the cassette.
+        """
+        # Matches come in recording order, the loaded interactions first
+        for index in self._matches(request):
+            return index < self._loaded_count
+        return False
 
     def _as_dict(self):
-        return {"requests": self.requests, "responses": self.responses}
+        return self._build_cassette_dict(self.data)
 
     def _build_used_interactions_dict(self):
         interactions = self._played_interactions + self._new_interactions()
+        return self._build_cassette_dict(interactions)
+
+    def _build_cassette_dict(self, interactions):
         cassete_dict = {
             "requests": [request for request, _ in interactions],
             "responses": [response for _, response in interactions],
         }
+        if self._filter_fingerprint is not None:
+            cassete_dict["filter_fingerprint"] = self._filter_fingerprint
+        if self.record_fingerprints:
+            fields = self._fingerprint_fields
+            cassete_dict["fingerprint_fields"] = list(fields)
+            cassete_dict["fingerprints"] = [
+                request.fingerprint(fields) for request in cassete_dict["requests"]
+            ]
         return cassete_dict
 
+    def _needs_refiltering(self, loaded_cassette):
+        """
+        Whether the loaded interactions have to go through the filters again,
+        which is the case unless they were recorded with the same filters
+        configuration as the current one.
+        """
+        if self.refilter_on_load or self._filter_fingerprint is None:
+            return True
+        return getattr(loaded_cassette, "filter_fingerprint", None) != self._filter_fingerprint
+
+    def _can_append_fingerprints(self, loaded_cassette):
+        """
+        Whether the fingerprints of new interactions can be appended to the
+        loaded cassette, which is verified against the fields it was saved with.
+        """
+        if not self.record_fingerprints:
+            return True
+        return getattr(loaded_cassette, "fingerprint_fields", None) == self._fingerprint_fields
+
     def _save(self, force=False):
         if self.drop_unused_requests and len(self._played_interactions) < len(self._old_interactions):
+            # The saved cassette is compacted to the used interactions
             cassete_dict = self._build_used_interactions_dict()
-            force = True
-        else:
+            saved_count = 0
+        elif self.dirty and not force and self._append():
+            # Only the new interactions were written
+            cassete_dict = None
+            saved_count = len(self.data)
+        elif force or self.dirty:
             cassete_dict = self._as_dict()
-        if force or self.dirty:
+            saved_count = len(self.data)
+        else:
+            return
+        if cassete_dict is not None:
             self._persister.save_cassette(self._path, cassete_dict, serializer=self._serializer)
-            self.dirty = False
+        self._saved_count = saved_count
+        self._saved_changes = self.data.changes
+        self.dirty = False
+
+    def _append(self):
+        """
+        Append the interactions recorded since the cassette was saved to it,
+        when the persister can, building only these. Returns whether they
+        were appended.
+        """
+        append_cassette = getattr(self._persister, "append_cassette", None)
+        if not self._saved_count or self.data.changes != self._saved_changes or append_cassette is None:
+            return False
+        cassete_dict = self._build_cassette_dict(self.data[self._saved_count :])
+        return append_cassette(self._path, cassete_dict, serializer=self._serializer)
 
     def _load(self):
         try:
-            requests, responses = self._persister.load_cassette(self._path, serializer=self._serializer)
-            for request, response in zip(requests, responses, strict=False):
-                self.append(request, response)
-                self._old_interactions.append((request, response))
+            if self.lazy_load:
+                loaded_cassette = self._persister.load_cassette(
+                    self._path,
+                    serializer=self._serializer,
+                    lazy=True,
+                )
+            else:
+                loaded_cassette = self._persister.load_cassette(self._path, serializer=self._serializer)
+            refilter = self._needs_refiltering(loaded_cassette)
+            interactions = getattr(loaded_cassette, "interactions", None)
+            if interactions is None or refilter:
+                interactions = zip(*loaded_cassette, strict=False)
+            for interaction in interactions:
+                if refilter:
+                    self.append(*interaction)
+                else:
+                    # These interactions were filtered when they were
+                    # recorded, lazy ones are built as they are needed
+                    self.data.append(interaction)
+                self._old_interactions.append(interaction)
+            self._loaded_count = len(self.data)
+            if not refilter and self._can_append_fingerprints(loaded_cassette):
+                # self.data holds the interactions of the cassette as is
+                self._saved_count = self._loaded_count
+                self._saved_changes = self.data.changes
             self.dirty = False
             self.rewound = True
         except (CassetteDecodeError, CassetteNotFoundError):
@@ -377,7 +701,41 @@ class Cassette:
 
     def __contains__(self, request):
         """Return whether or not a request has been stored"""
-        for index, _ in self._responses(request):
-            if self.play_counts[index] == 0 or self.allow_playback_repeats:
-                return True
-        return False
+        return self._first_playable(self._before_record_request(request)) is not None
+
+
+class Playback:
+    """
+    The result of looking a request up in a cassette: the request as filtered
+    by the cassette, and the recorded response claimed for it, if any.
+    """
+
+    def __init__(self, cassette, request, filtered_request, index):
+        self.cassette = cassette
+        self.request = request
+        self.filtered_request = filtered_request
+        self._index = index
+
+    @property
+    def can_play(self):
+        """Whether a recorded response was found for the request."""
+        return self._index is not None
+
+    @property
+    def recorded_request(self):
+        """The recorded request of the claimed response, if any."""
+        if self._index is None:
+            return None
+        return self.cassette.data[self._index][0]
+
+    def play(self):
+        """
+        Get the claimed response and mark it as played.
+        """
+        cassette = self.cassette
+        index = self._index
+        if index is not None and (cassette.play_counts[index] == 0 or cassette.allow_playback_repeats):
+            return cassette._play(index)
+        # Nothing was claimed, or the claimed response has been played
+        # since the lookup: look the request up again.
+        return cassette.play_response(self.request)
@@ -1,5 +1,6 @@
 import copy
 import functools
+import hashlib
 import inspect
 import os
 import types
@@ -10,7 +11,7 @@ from . import filters, matchers
 from .cassette import Cassette
 from .persisters.filesystem import FilesystemPersister
 from .record_mode import RecordMode, validate_record_mode
-from .serializers import jsonserializer, yamlserializer
+from .serializers import binaryserializer, jsonlserializer, jsonserializer, yamlserializer
 from .util import auto_decorate, compose
 
 
@@ -49,11 +50,22 @@ class VCR:
         decode_compressed_response=False,
         record_on_exception=True,
         drop_unused_requests=False,
+        refilter_on_load=False,
+        adaptive_match_order=False,
+        record_fingerprints=False,
+        digest_request_bodies_over=None,
+        lazy_load=False,
+        cassette_cache_dir=None,
     ):
         self.serializer = serializer
         self.match_on = match_on
         self.cassette_library_dir = cassette_library_dir
-        self.serializers = {"yaml": yamlserializer, "json": jsonserializer}
+        self.serializers = {
+            "yaml": yamlserializer,
+            "json": jsonserializer,
+            "jsonl": jsonlserializer,
+            "binary": binaryserializer,
+        }
         self.matchers = {
             "method": matchers.method,
             "uri": matchers.uri,
@@ -66,8 +78,9 @@ class VCR:
             "headers": matchers.headers,
             "raw_body": matchers.raw_body,
             "body": matchers.body,
+            "body_digest": matchers.body_digest,
         }
-        self.persister = FilesystemPersister
+        self.persister = FilesystemPersister.with_cache_dir(cassette_cache_dir)
         self.record_mode = validate_record_mode(record_mode)
         self.filter_headers = filter_headers
         self.filter_query_parameters = filter_query_parameters
@@ -83,6 +96,11 @@ class VCR:
         self.record_on_exception = record_on_exception
         self._custom_patches = tuple(custom_patches)
         self.drop_unused_requests = drop_unused_requests
+        self.refilter_on_load = refilter_on_load
+        self.adaptive_match_order = adaptive_match_order
+        self.record_fingerprints = record_fingerprints
+        self.digest_request_bodies_over = digest_request_bodies_over
+        self.lazy_load = lazy_load
 
     def _get_serializer(self, serializer_name):
         try:
@@ -92,13 +110,13 @@ class VCR:
         return serializer
 
     def _get_matchers(self, matcher_names):
-        matchers = []
+        matcher_functions = []
         try:
             for m in matcher_names:
-                matchers.append(self.matchers[m])
+                matcher_functions.append(self.matchers[m])
         except KeyError:
             raise KeyError(f"Matcher {m} doesn't exist or isn't registered") from None
-        return matchers
+        return matchers.MatcherChain(matcher_functions)
 
     def use_cassette(self, path=None, **kwargs):
         if path is not None and not isinstance(path, (str, Path)):
@@ -154,6 +172,11 @@ class VCR:
             "allow_playback_repeats": kwargs.get("allow_playback_repeats", False),
             "record_on_exception": record_on_exception,
             "drop_unused_requests": kwargs.get("drop_unused_requests", self.drop_unused_requests),
+            "filter_fingerprint": self._build_filter_fingerprint(kwargs),
+            "refilter_on_load": kwargs.get("refilter_on_load", self.refilter_on_load),
+            "adaptive_match_order": kwargs.get("adaptive_match_order", self.adaptive_match_order),
+            "record_fingerprints": kwargs.get("record_fingerprints", self.record_fingerprints),
+            "lazy_load": kwargs.get("lazy_load", self.lazy_load),
         }
         path = kwargs.get("path")
         if path:
@@ -197,6 +220,10 @@ class VCR:
         )
         ignore_hosts = options.get("ignore_hosts", self.ignore_hosts)
         ignore_localhost = options.get("ignore_localhost", self.ignore_localhost)
+        digest_request_bodies_over = options.get(
+            "digest_request_bodies_over",
+            self.digest_request_bodies_over,
+        )
         if filter_headers:
             replacements = [h if isinstance(h, tuple) else (h, None) for h in filter_headers]
             filter_functions.append(functools.partial(filters.replace_headers, replacements=replacements))
@@ -222,8 +249,15 @@ class VCR:
                 before_record_request = (before_record_request,)
             filter_functions.extend(before_record_request)
 
+        if digest_request_bodies_over is not None:
+            filter_functions.append(
+                functools.partial(filters.replace_body_with_digest, min_size=digest_request_bodies_over),
+            )
+
         def before_record_request(request):
-            request = copy.deepcopy(request)
+            # The filters get a copy-on-write copy of the request, the headers
+            # are only copied if a filter uses them.
+            request = copy.copy(request)
             for function in filter_functions:
                 if request is None:
                     break
@@ -232,6 +266,27 @@ class VCR:
 
         return before_record_request
 
+    def _build_filter_fingerprint(self, options):
+        """
+        Build a fingerprint of the options used by the request and response
+        filters. It is stored in the cassettes, so that the interactions of a
+        cassette recorded with the same filters don't need to be filtered again
+        when it is loaded.
+        """
+        filter_options = (
+            options.get("filter_headers", self.filter_headers),
+            options.get("filter_query_parameters", self.filter_query_parameters),
+            options.get("filter_post_data_parameters", self.filter_post_data_parameters),
+            options.get("before_record_request", options.get("before_record", self.before_record_request)),
+            sorted(options.get("ignore_hosts", self.ignore_hosts)),
+            options.get("ignore_localhost", self.ignore_localhost),
+            options.get("before_record_response", self.before_record_response),
+            options.get("decode_compressed_response", self.decode_compressed_response),
+            options.get("digest_request_bodies_over", self.digest_request_bodies_over),
+        )
+        description = repr(_describe_filter_option(filter_options)).encode("utf-8")
+        return hashlib.sha256(description).hexdigest()
+
     @staticmethod
     def _build_ignore_hosts(hosts_to_ignore):
         def filter_ignored_hosts(request):
@@ -259,3 +314,57 @@ class VCR:
         predicate = predicate or self.is_test_method
         metaclass = auto_decorate(self.use_cassette, predicate)
         return metaclass("temporary_class", (), {})
+
+
+def _describe_filter_option(option, depth=0):
+    """
+    Describe a filter option with values whose repr is stable across runs.
+
+    Functions are described by their name, bytecode, constants, the names of
+    the attributes and globals they use, defaults and closure, so that
+    editing a filter changes its description. Objects that can't be described
+    this way fall back to their repr, which usually contains their address
+    and so makes the fingerprint change on every run:
+    the cassette is then always filtered again, as it would be without a
+    fingerprint.
+    """
+    if depth > 10:
+        return repr(option)
+    depth += 1
+    if option is None or isinstance(option, (str, bytes, int, float)):
+        return option
+    if isinstance(option, (list, tuple)):
+        return tuple(_describe_filter_option(item, depth) for item in option)
+    if isinstance(option, dict):
+        return tuple(
+            (_describe_filter_option(key, depth), _describe_filter_option(value, depth))
+            for key, value in option.items()
+        )
+    if isinstance(option, functools.partial):
+        return (
+            "partial",
+            _describe_filter_option(option.func, depth),
+            _describe_filter_option(option.args, depth),
+            _describe_filter_option(option.keywords, depth),
+        )
+    if isinstance(option, types.CodeType):
+        # The names of the attributes and globals used, which the bytecode
+        # only refers to by their index
+        return (option.co_code, option.co_names, _describe_filter_option(option.co_consts, depth))
+    if isinstance(option, types.FunctionType):
+        return (
+            option.__module__,
+            option.__qualname__,
+            _describe_filter_option(option.__code__, depth),
+            _describe_filter_option(option.__defaults__, depth),
+            _describe_filter_option(tuple(_cell_contents(cell) for cell in option.__closure__ or ()), depth),
+        )
+    return repr(option)
+
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # The cell is empty
+        return None
@@ -1,20 +1,48 @@
 class CannotOverwriteExistingCassetteException(Exception):
+    # Maximum number of similar requests detailed in the message
+    max_similar_requests = 10
+
     def __init__(self, *args, **kwargs):
         self.cassette = kwargs["cassette"]
         self.failed_request = kwargs["failed_request"]
-        message = self._get_message(kwargs["cassette"], kwargs["failed_request"])
-        super().__init__(message)
+        self._message = None
+        super().__init__()
+
+    def __str__(self):
+        # Looking for similar requests runs the matchers against the whole
+        # cassette, only do it if the message is actually read.
+        if self._message is None:
+            self._message = self._get_message(self.cassette, self.failed_request)
+        return self._message
+
+    @property
+    def args(self):
+        return (str(self),)
 
-    @staticmethod
-    def _get_message(cassette, failed_request):
+    @args.setter
+    def args(self, args):
+        self._message = str(args[0]) if args else ""
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self)!r})"
+
+    @classmethod
+    def _get_message(cls, cassette, failed_request):
         """Get the final message related to the exception"""
         # Get the similar requests in the cassette that
         # have match the most with the request.
-        best_matches = cassette.find_requests_with_most_matches(failed_request)
+        best_matches = cassette.find_requests_with_most_matches(
+            failed_request,
+            limit=cls.max_similar_requests + 1,
+        )
+        nb_best_matches = len(best_matches)
+        if nb_best_matches > cls.max_similar_requests:
+            best_matches = best_matches[: cls.max_similar_requests]
+            nb_best_matches = f"more than {cls.max_similar_requests}"
         if best_matches:
             if best_matches[0][2]:
                 best_matches_msg = (
-                    f"Found {len(best_matches)} similar requests "
+                    f"Found {nb_best_matches} similar requests "
                     f"with {len(best_matches[0][2])} different matcher(s) :\n"
                 )
 
@@ -29,7 +57,7 @@ class CannotOverwriteExistingCassetteException(Exception):
                         best_matches_msg += f"{failed_matcher} - assertion failure :\n{assertion_msg}\n"
             else:
                 best_matches_msg = (
-                    f"Found {len(best_matches)} recorded request(s) matching ({failed_request!r}) "
+                    f"Found {nb_best_matches} recorded request(s) matching ({failed_request!r}) "
                     f"but they have already been consumed.\n"
                 )
         else:
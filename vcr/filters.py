@@ -4,7 +4,8 @@ import zlib
 from io import BytesIO
 from urllib.parse import urlencode, urlparse, urlunparse
 
-from .util import CaseInsensitiveDict
+from .request import Request
+from .util import CaseInsensitiveDict, digest_body, is_body_digest, read_body
 
 try:
     # This supports both brotli & brotlipy packages
@@ -57,7 +58,10 @@ def replace_headers(request, replacements):
     2. None to remove the given header.
     3. A callable which accepts (key, value, request) and returns a string value or None.
     """
-    new_headers = request.headers.copy()
+    headers = request.headers
+    if not any(k in headers for k, _ in replacements):
+        return request
+    new_headers = headers.copy()
     for k, rv in replacements:
         if k in new_headers:
             ov = new_headers.pop(k)
@@ -177,6 +181,18 @@ def remove_post_data_parameters(request, post_data_parameters_to_remove):
     return replace_post_data_parameters(request, replacements)
 
 
+def replace_body_with_digest(request, min_size):
+    """Replace the body of the request with its digest if it is larger than min_size bytes.
+
+    The digest holds the SHA-256 and the length of the body, see the
+    body_digest matcher.
+    """
+    body = read_body(request)
+    if not isinstance(body, bytes) or len(body) <= min_size or is_body_digest(body):
+        return request
+    return Request(request.method, request.uri, digest_body(body), request.headers)
+
+
 def decode_response(response):
     """
     If the response is compressed with any supported compression (gzip,
@@ -1,76 +1,235 @@
 import json
 import logging
+import math
+import operator
+import time
 import urllib
 import xmlrpc.client
 from string import hexdigits
 
-from .util import read_body
+from .request import FINGERPRINT_FIELDS, Request
+from .util import digest_body, is_body_digest, read_body
 
-_HEXDIG_CODE_POINTS: set[int] = {ord(s.encode("ascii")) for s in hexdigits}
+_HEXDIGITS = hexdigits.encode("ascii")
 
 log = logging.getLogger(__name__)
 
 
+def keyed(key, implies_match=False):
+    """
+    Decorator attaching a key projection to a matcher, so that cassettes can
+    index their requests on it.
+
+    ``key(request)`` must return a hashable value, and two requests with
+    different keys must never match. When ``implies_match`` is true, two
+    requests with equal keys always match and the matcher itself doesn't need
+    to be run on them.
+    """
+
+    def decorator(matcher):
+        matcher.key = key
+        matcher.key_implies_match = implies_match
+        return matcher
+
+    return decorator
+
+
+def get_key(matcher):
+    """
+    Get the key projection of a matcher, or None if the matcher can't be used
+    to index requests.
+    """
+    return getattr(matcher, "key", None)
+
+
+def key_implies_match(matcher):
+    """
+    Whether two requests with the same key always match with the matcher.
+    """
+    return get_key(matcher) is not None and getattr(matcher, "key_implies_match", False) is True
+
+
+def _query_key(request):
+    # The sorted query of vcr Requests is cached as a tuple
+    query = getattr(request, "_query", None)
+    return tuple(request.query) if query is None else query
+
+
+@keyed(operator.attrgetter("method"), implies_match=True)
 def method(r1, r2):
     if r1.method != r2.method:
         raise AssertionError(f"{r1.method} != {r2.method}")
 
 
+@keyed(operator.attrgetter("uri"), implies_match=True)
 def uri(r1, r2):
     if r1.uri != r2.uri:
         raise AssertionError(f"{r1.uri} != {r2.uri}")
 
 
+@keyed(operator.attrgetter("host"), implies_match=True)
 def host(r1, r2):
     if r1.host != r2.host:
         raise AssertionError(f"{r1.host} != {r2.host}")
 
 
+@keyed(operator.attrgetter("scheme"), implies_match=True)
 def scheme(r1, r2):
     if r1.scheme != r2.scheme:
         raise AssertionError(f"{r1.scheme} != {r2.scheme}")
 
 
+@keyed(operator.attrgetter("port"), implies_match=True)
 def port(r1, r2):
     if r1.port != r2.port:
         raise AssertionError(f"{r1.port} != {r2.port}")
 
 
+@keyed(operator.attrgetter("path"), implies_match=True)
 def path(r1, r2):
     if r1.path != r2.path:
         raise AssertionError(f"{r1.path} != {r2.path}")
 
 
+@keyed(_query_key, implies_match=True)
 def query(r1, r2):
     if r1.query != r2.query:
         raise AssertionError(f"{r1.query} != {r2.query}")
 
 
+def _read_bodies(r1, r2):
+    b1 = read_body(r1)
+    b2 = read_body(r2)
+    if is_body_digest(b1) or is_body_digest(b2):
+        # The body of one of the requests was recorded as a digest, the one
+        # of vcr Requests is cached
+        d1 = getattr(r1, "_content_digest", None) or digest_body(b1)
+        d2 = getattr(r2, "_content_digest", None) or digest_body(b2)
+        return d1, d2, True
+    return b1, b2, False
+
+
 def raw_body(r1, r2):
-    if read_body(r1) != read_body(r2):
+    b1, b2, _ = _read_bodies(r1, r2)
+    if b1 != b2:
+        raise AssertionError
+
+
+def _body_digest_key(request):
+    # The body digest of vcr Requests is cached
+    digest = getattr(request, "_content_digest", None)
+    return digest_body(read_body(request)) if digest is None else digest
+
+
+@keyed(_body_digest_key, implies_match=True)
+def body_digest(r1, r2):
+    if _body_digest_key(r1) != _body_digest_key(r2):
         raise AssertionError
 
 
 def body(r1, r2):
+    b1, b2, digested = _read_bodies(r1, r2)
     transformers = list(_get_transformers(r1))
-    if transformers != list(_get_transformers(r2)):
+    if digested or transformers != list(_get_transformers(r2)):
         transformers = []
 
-    b1 = read_body(r1)
-    b2 = read_body(r2)
-    for transform in transformers:
-        b1 = transform(b1)
-        b2 = transform(b2)
+    if transformers:
+        b1 = _transform_body(r1, b1, transformers)
+        b2 = _transform_body(r2, b2, transformers)
 
     if b1 != b2:
         raise AssertionError
 
 
+# The request field compared by each built-in matcher
+_MATCHED_FIELDS = (
+    (method, "method"),
+    (uri, "uri"),
+    (host, "host"),
+    (scheme, "scheme"),
+    (port, "port"),
+    (path, "path"),
+    (query, "query"),
+    (raw_body, "body"),
+    (body_digest, "body"),
+    (body, "body"),
+)
+
+
+def fingerprint_fields(matchers):
+    """
+    The request fields compared by the built-in matchers among matchers, to
+    be given to ``Request.fingerprint``. They come in a fixed order, whatever
+    the order of the matchers. Other matchers are ignored, and the default
+    fields are used when none of the matchers is a built-in one.
+    """
+    # Matchers are compared by identity, they may not be hashable
+    matched = {field for matcher in matchers for built_in, field in _MATCHED_FIELDS if matcher is built_in}
+    return tuple(
+        field for field in dict.fromkeys(field for _, field in _MATCHED_FIELDS) if field in matched
+    ) or (FINGERPRINT_FIELDS)
+
+
+def _transform_body(request, body, transformers):
+    """
+    Apply the transformers to the body of the request. The result is cached
+    on vcr requests, per set of transformers, since a stored request is
+    compared again and again while its body doesn't change.
+    """
+    if not isinstance(request, Request):
+        for transform in transformers:
+            body = transform(body)
+        return body
+
+    key = tuple(transformers)
+    if request._transformed_bodies is None:
+        request._transformed_bodies = {}
+    elif key in request._transformed_bodies:
+        return request._transformed_bodies[key]
+    for transform in transformers:
+        body = transform(body)
+    request._transformed_bodies[key] = body
+    return body
+
+
+def _headers_key(request):
+    try:
+        return request.headers.frozen_lower_items()
+    except TypeError:
+        # Some values aren't hashable, the request can't be indexed on its headers
+        return dict(request.headers.lower_items())
+
+
+@keyed(_headers_key, implies_match=True)
 def headers(r1, r2):
     if r1.headers != r2.headers:
         raise AssertionError(f"{r1.headers} != {r2.headers}")
 
 
+def headers_subset(names):
+    """
+    Build a matcher comparing only the given headers of two requests. Header
+    names are case insensitive, and a header missing from both requests
+    matches. The matcher is keyed on the values of these headers.
+    """
+    names = tuple(name.lower() for name in names)
+
+    def key(request):
+        headers = request.headers
+        return tuple(headers.get(name) for name in names)
+
+    @keyed(key, implies_match=True)
+    def matcher(r1, r2):
+        values1, values2 = key(r1), key(r2)
+        if values1 != values2:
+            headers1 = dict(zip(names, values1, strict=True))
+            headers2 = dict(zip(names, values2, strict=True))
+            raise AssertionError(f"{headers1} != {headers2}")
+
+    matcher.__name__ = f"headers_subset({', '.join(names)})"
+    return matcher
+
+
 def _header_checker(value, header="Content-Type"):
     def checker(headers):
         _header = headers.get(header, "")
@@ -86,6 +245,9 @@ def _dechunk(body):
         body = body.encode("utf-8")
     elif isinstance(body, bytearray):
         body = bytes(body)
+    elif isinstance(body, bytes):
+        # Like any other empty iterable
+        body = body or None
     elif hasattr(body, "__iter__"):
         body = list(body)
         if body:
@@ -106,22 +268,20 @@ def _dechunk(body):
     # Now decode chunked data format (https://en.wikipedia.org/wiki/Chunked_transfer_encoding)
     # Example input: b"45\r\n<69 bytes>\r\n0\r\n\r\n" where int(b"45", 16) == 69.
     CHUNK_GAP = b"\r\n"
-    BODY_LEN: int = len(body)
 
     chunks: list[bytes] = []
     pos: int = 0
 
     while True:
-        for i in range(pos, BODY_LEN):
-            if body[i] not in _HEXDIG_CODE_POINTS:
-                break
-
-        if i == 0 or body[i : i + len(CHUNK_GAP)] != CHUNK_GAP:
+        i = body.find(CHUNK_GAP, pos)
+        size_digits = body[pos:i] if i != -1 else b""
+        # The chunk size is made of hexadecimal digits only
+        if not size_digits or size_digits.translate(None, _HEXDIGITS):
             if pos == 0:
                 return body  # i.e. assume non-chunk data
             raise ValueError("Malformed chunked data")
 
-        size_bytes = int(body[pos:i], 16)
+        size_bytes = int(size_digits, 16)
         if size_bytes == 0:  # i.e. well-formed ending
             return b"".join(chunks)
 
@@ -137,6 +297,10 @@ def _dechunk(body):
         pos = chunk_data_after_last + len(CHUNK_GAP)
 
 
+def _transform_form_urlencoded(body):
+    return urllib.parse.parse_qs(body.decode("ascii"))
+
+
 def _transform_json(body):
     if body:
         return json.loads(body)
@@ -146,10 +310,7 @@ _xml_header_checker = _header_checker("text/xml")
 _xmlrpc_header_checker = _header_checker("xmlrpc", header="User-Agent")
 _checker_transformer_pairs = (
     (_header_checker("chunked", header="Transfer-Encoding"), _dechunk),
-    (
-        _header_checker("application/x-www-form-urlencoded"),
-        lambda body: urllib.parse.parse_qs(body.decode("ascii")),
-    ),
+    (_header_checker("application/x-www-form-urlencoded"), _transform_form_urlencoded),
     (_header_checker("application/json"), _transform_json),
     (lambda request: _xml_header_checker(request) and _xmlrpc_header_checker(request), xmlrpc.client.loads),
 )
@@ -161,11 +322,139 @@ def _get_transformers(request):
             yield transformer
 
 
+def _compile_matcher(matcher):
+    """
+    Get a predicate telling whether two requests match with a matcher. It
+    returns None or a boolean, or raises AssertionError, like matchers do.
+    """
+    if key_implies_match(matcher):
+        # Compare the keys directly, the matcher may build an assertion
+        # message on failure.
+        key = get_key(matcher)
+        return lambda r1, r2: key(r1) == key(r2)
+    return matcher
+
+
+class MatcherChain(tuple):
+    """
+    A sequence of matchers, compiled for the hot match path. Calling it tells
+    whether two requests match, stopping at the first failing matcher and
+    without building any failure details. These are only computed by
+    get_matchers_results.
+    """
+
+    def __new__(cls, matchers=()):
+        chain = super().__new__(cls, matchers)
+        chain._predicates = tuple(_compile_matcher(matcher) for matcher in chain)
+        return chain
+
+    def __call__(self, r1, r2):
+        try:
+            for predicate in self._predicates:
+                match = predicate(r1, r2)
+                if match is not None and not match:
+                    return False
+        except AssertionError:
+            return False
+        return True
+
+
+class MatcherStatistics:
+    """
+    Counters of the evaluations, rejections and time spent of matchers.
+    """
+
+    def __init__(self):
+        self._counters = {}
+
+    def record(self, matcher, duration, rejected):
+        counters = self._counters.setdefault(matcher, [0, 0, 0.0])
+        counters[0] += 1
+        counters[1] += rejected
+        counters[2] += duration
+
+    def score(self, matcher):
+        """
+        The time spent by the matcher per rejected request: the lower, the
+        earlier it should run. Matchers that haven't been evaluated yet come
+        first, so that they get measured, and matchers that never reject
+        anything come last.
+        """
+        evaluations, rejections, duration = self._counters.get(matcher, (0, 0, 0.0))
+        if not evaluations:
+            return 0.0
+        if not rejections:
+            return math.inf
+        return duration / rejections
+
+    def report(self, matchers):
+        report = []
+        for matcher in matchers:
+            evaluations, rejections, duration = self._counters.get(matcher, (0, 0, 0.0))
+            report.append(
+                {
+                    "matcher": matcher.__name__,
+                    "evaluations": evaluations,
+                    "rejections": rejections,
+                    "time": duration,
+                },
+            )
+        return report
+
+
+class AdaptiveMatcherChain(MatcherChain):
+    """
+    A matcher chain that measures how selective and how costly its matchers
+    are, and regularly reorders them to run the most selective and cheapest
+    ones first. The order doesn't change whether two requests match.
+    """
+
+    reorder_interval = 100
+
+    def __new__(cls, matchers=(), statistics=None):
+        chain = super().__new__(cls, matchers)
+        chain.statistics = statistics if statistics is not None else MatcherStatistics()
+        chain._positions = tuple(range(len(chain)))
+        chain._calls = 0
+        return chain
+
+    @property
+    def order(self):
+        """The matchers in the order they currently run in."""
+        return tuple(self[position] for position in self._positions)
+
+    def _reorder(self):
+        positions = range(len(self))
+        self._positions = tuple(sorted(positions, key=lambda position: self.statistics.score(self[position])))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Reordered matchers: %s", [matcher.__name__ for matcher in self.order])
+
+    def __call__(self, r1, r2):
+        self._calls += 1
+        if self._calls % self.reorder_interval == 0:
+            self._reorder()
+        for position in self._positions:
+            start = time.perf_counter()
+            try:
+                match = self._predicates[position](r1, r2)
+                match = match is None or bool(match)
+            except AssertionError:
+                match = False
+            self.statistics.record(self[position], time.perf_counter() - start, rejected=not match)
+            if not match:
+                return False
+        return True
+
+
 def requests_match(r1, r2, matchers):
-    _, failures = get_matchers_results(r1, r2, matchers)
-    if failures:
+    if not isinstance(matchers, MatcherChain):
+        matchers = MatcherChain(matchers)
+    if matchers(r1, r2):
+        return True
+    if log.isEnabledFor(logging.DEBUG):
+        _, failures = get_matchers_results(r1, r2, matchers)
         log.debug(f"Requests {r1} and {r2} differ.\nFailure details:\n{failures}")
-    return len(failures) == 0
+    return False
 
 
 def _evaluate_matcher(matcher_function, *args):
@@ -185,14 +474,18 @@ def _evaluate_matcher(matcher_function, *args):
     return match, assertion_message
 
 
-def get_matchers_results(r1, r2, matchers):
+def get_matchers_results(r1, r2, matchers, min_successes=0):
     """
     Get the comparison results of two requests as two list.
     The first returned list represents the matchers names that passed.
     The second list is the failed matchers as a string with failed assertion details if any.
+    The evaluation stops as soon as fewer than min_successes matchers can pass,
+    leaving the results incomplete.
     """
     matches_success, matches_fails = [], []
-    for m in matchers:
+    for position, m in enumerate(matchers):
+        if len(matches_success) + len(matchers) - position < min_successes:
+            break
         matcher_name = m.__name__
         match, assertion_message = _evaluate_matcher(m, r1, r2)
         if match:
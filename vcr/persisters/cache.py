@@ -0,0 +1,120 @@
+"""
+On-disk cache of parsed cassettes.
+
+Parsing a large YAML cassette takes much longer than reading the same data
+in the binary cassette format, so the first time a cassette is loaded the
+data parsed by its serializer is stored in the cache directory in that
+format. The next loads read it from there, as long as the cassette, its
+serializer and the VCR.py version haven't changed.
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+
+from ..serialize import CASSETTE_FORMAT_VERSION, is_binary
+from ..serializers import binaryserializer
+
+# Bump when the cached data changes for the same cassette
+CACHE_FORMAT_VERSION = 1
+
+
+def _serializer_name(serializer):
+    # Serializers are modules, or instances of a class
+    name = getattr(serializer, "__name__", None)
+    if isinstance(name, str):
+        return name
+    serializer_class = type(serializer)
+    return f"{serializer_class.__module__}.{serializer_class.__qualname__}"
+
+
+class ParsedCassetteCache:
+    """
+    Cache of the data parsed from cassettes, in a directory. The entry of a
+    cassette is keyed by its path and serializer, and is only used when the
+    size and the SHA-256 of the cassette, and the versions, are the ones it
+    was stored with.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def serializer_for(self, cassette_path, content, serializer):
+        """
+        Returns a serializer wrapping serializer, which reads the data of the
+        cassette holding content from the cache, or parses it and stores it.
+        """
+        if is_binary(serializer):
+            # Binary cassettes are as fast to load as their cache entry
+            return serializer
+        return _CachedSerializer(self, Path(cassette_path), content, serializer)
+
+    def _entry_path(self, cassette_path, serializer_name):
+        entry_name = f"{os.path.abspath(cassette_path)}\0{serializer_name}"
+        digest = hashlib.sha256(entry_name.encode("utf-8", "surrogateescape")).hexdigest()
+        return self.directory / f"{digest}.vcrb"
+
+    def _key(self, cassette_path, content, serializer_name):
+        from vcr import __version__
+
+        return {
+            "cassette": os.path.abspath(cassette_path),
+            "size": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "serializer": serializer_name,
+            "cassette_format": CASSETTE_FORMAT_VERSION,
+            "cache_format": CACHE_FORMAT_VERSION,
+            "vcr": __version__,
+        }
+
+    def _read(self, entry_path, key):
+        """Returns the data of the entry, or None if it is missing or stale"""
+        try:
+            entry = binaryserializer.deserialize(entry_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        return entry.get("data")
+
+    def _write(self, entry_path, key, data):
+        """Stores the entry, unless the data can't be (e.g. a BytesIO body)"""
+        try:
+            content = binaryserializer.serialize({"key": key, "data": data})
+        except TypeError:
+            return
+        with suppress(OSError):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Tests running in parallel may store the same entry
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.replace(temporary_path, entry_path)
+            finally:
+                with suppress(FileNotFoundError):
+                    os.unlink(temporary_path)
+
+
+class _CachedSerializer:
+    """The serializer of a cassette, going through its cache entry"""
+
+    def __init__(self, cache, cassette_path, content, serializer):
+        self._cache = cache
+        self._serializer = serializer
+        serializer_name = _serializer_name(serializer)
+        self._entry_path = cache._entry_path(cassette_path, serializer_name)
+        self._key = cache._key(cassette_path, content, serializer_name)
+
+    def deserialize(self, cassette_string):
+        data = self._cache._read(self._entry_path, self._key)
+        if data is None:
+            data = self._serializer.deserialize(cassette_string)
+            # Stored before the data gets modified by the loading
+            self._cache._write(self._entry_path, self._key, data)
+        return data
+
+    def serialize(self, cassette_dict):
+        return self._serializer.serialize(cassette_dict)
@@ -1,8 +1,10 @@
 # .. _persister_example:
 
+import io
 from pathlib import Path
 
-from ..serialize import deserialize, serialize
+from ..serialize import append_to, can_append, deserialize, is_binary, serialize_to
+from .cache import ParsedCassetteCache
 
 
 class CassetteNotFoundError(FileNotFoundError):
@@ -14,27 +16,75 @@ class CassetteDecodeError(ValueError):
 
 
 class FilesystemPersister:
+    # The directory of the parsed cassettes cache, see with_cache_dir
+    cache_dir = None
+
+    @classmethod
+    def with_cache_dir(cls, cache_dir):
+        """
+        Returns a persister loading the cassettes through a cache of their
+        parsed data in cache_dir, or this one if cache_dir is None.
+        """
+        if cache_dir is None:
+            return cls
+        return type(cls.__name__, (cls,), {"cache_dir": cache_dir})
+
     @classmethod
-    def load_cassette(cls, cassette_path, serializer):
+    def load_cassette(cls, cassette_path, serializer, lazy=False):
         cassette_path = Path(cassette_path)  # if cassette path is already Path this is no operation
         if not cassette_path.is_file():
             raise CassetteNotFoundError()
+        if is_binary(serializer):
+            return deserialize(cassette_path.read_bytes(), serializer, lazy=lazy)
         try:
-            with cassette_path.open() as f:
-                data = f.read()
+            if cls.cache_dir is None:
+                with cassette_path.open() as f:
+                    data = f.read()
+            else:
+                # The cache entries are checked against the content of the
+                # cassette, which is decoded as open() does
+                content = cassette_path.read_bytes()
+                cache = ParsedCassetteCache(cls.cache_dir)
+                serializer = cache.serializer_for(cassette_path, content, serializer)
+                data = io.TextIOWrapper(io.BytesIO(content)).read()
         except UnicodeDecodeError as err:
             raise CassetteDecodeError("Can't read Cassette, Encoding is broken") from err
 
-        return deserialize(data, serializer)
+        return deserialize(data, serializer, lazy=lazy)
 
     @staticmethod
     def save_cassette(cassette_path, cassette_dict, serializer):
-        data = serialize(cassette_dict, serializer)
         cassette_path = Path(cassette_path)  # if cassette path is already Path this is no operation
 
         cassette_folder = cassette_path.parent
         if not cassette_folder.exists():
             cassette_folder.mkdir(parents=True)
 
-        with cassette_path.open("w") as f:
-            f.write(data)
+        # The cassette is streamed to a temporary file, which replaces the
+        # cassette once it is complete, so that a serialization error doesn't
+        # leave a truncated cassette behind
+        temporary_path = cassette_path.with_name(f".{cassette_path.name}.tmp")
+        try:
+            with temporary_path.open("wb" if is_binary(serializer) else "w") as f:
+                serialize_to(cassette_dict, serializer, f.write)
+            temporary_path.replace(cassette_path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def append_cassette(cassette_path, cassette_dict, serializer):
+        """
+        Append the interactions of cassette_dict to the saved cassette, when
+        the serializer can. Returns whether they were appended, the cassette
+        has to be saved in full otherwise.
+        """
+        cassette_path = Path(cassette_path)
+        if not can_append(serializer) or not cassette_path.is_file():
+            return False
+        # The interactions are serialized first so that an error doesn't
+        # leave a partial record behind
+        chunks = []
+        append_to(cassette_dict, serializer, chunks.append)
+        with cassette_path.open("ab" if is_binary(serializer) else "a") as f:
+            f.writelines(chunks)
+        return True
@@ -1,20 +1,48 @@
+import copy
+import hashlib
 import logging
 import warnings
 from contextlib import suppress
 from io import BytesIO
 from urllib.parse import parse_qsl, urlparse
 
-from .util import CaseInsensitiveDict, _is_nonsequence_iterator
+from .util import CaseInsensitiveDict, _is_nonsequence_iterator, _join_body_chunks, digest_body
 
 log = logging.getLogger(__name__)
 
+_DEFAULT_PORTS = {"https": 443, "http": 80}
+
+# Request fields that can be part of a fingerprint, and the default ones
+_FINGERPRINTABLE_FIELDS = frozenset(("method", "uri", "scheme", "host", "port", "path", "query", "body"))
+FINGERPRINT_FIELDS = ("method", "uri", "body")
+
 
 class Request:
     """
     VCR's representation of a request.
     """
 
+    # Cassettes can hold tens of thousands of requests, keep them compact.
+    __slots__ = (
+        "_body",
+        "_body_digest",
+        "_fingerprints",
+        "_header_items",
+        "_headers",
+        "_host",
+        "_joined_body",
+        "_method",
+        "_parsed_uri",
+        "_port",
+        "_sorted_query",
+        "_transformed_bodies",
+        "_uri",
+        "_was_file",
+        "_was_iter",
+    )
+
     def __init__(self, method, uri, body, headers):
+        self._fingerprints = None
         self.method = method
         self.uri = uri
         self._was_file = hasattr(body, "read")
@@ -33,6 +61,15 @@ class Request:
         self.headers = headers
         log.debug("Invoking Request %s", self.uri)
 
+    @property
+    def method(self):
+        return self._method
+
+    @method.setter
+    def method(self, method):
+        self._method = method
+        self._fingerprints = None
+
     @property
     def uri(self):
         return self._uri
@@ -40,17 +77,43 @@ class Request:
     @uri.setter
     def uri(self, uri):
         self._uri = uri
-        self.parsed_uri = urlparse(uri)
+        # The uri is parsed, and the components derived from it computed,
+        # on first access and kept, the matchers read them for every stored
+        # request compared.
+        self._parsed_uri = self._host = self._port = self._sorted_query = None
+        self._fingerprints = None
+
+    @property
+    def parsed_uri(self):
+        if self._parsed_uri is None:
+            self._parsed_uri = urlparse(self._uri)
+        return self._parsed_uri
 
     @property
     def headers(self):
+        if self._headers is None:
+            # First access, the headers may be modified from now on
+            headers = HeadersDict()
+            headers._store.update((key.lower(), (key, value)) for key, value in self._header_items)
+            self._headers = headers
+            self._header_items = None
         return self._headers
 
     @headers.setter
     def headers(self, value):
-        if not isinstance(value, HeadersDict):
-            value = HeadersDict(value)
-        self._headers = value
+        if isinstance(value, HeadersDict):
+            self._headers = value
+            self._header_items = None
+        else:
+            # Only keep the header pairs until they are accessed
+            self._headers = None
+            self._header_items = tuple(HeadersDict(value)._store.values())
+
+    def _iter_headers(self):
+        """Iterate over the headers (key, value) pairs without building the HeadersDict"""
+        if self._headers is None:
+            return iter(self._header_items)
+        return iter(self._headers.items())
 
     @property
     def body(self):
@@ -65,6 +128,34 @@ class Request:
         if isinstance(value, str):
             value = value.encode("utf-8")
         self._body = value
+        self._joined_body = None
+        self._body_digest = None
+        self._fingerprints = None
+        # Body transformations cached by the body matcher
+        self._transformed_bodies = None
+
+    @property
+    def _content(self):
+        """
+        The body as bytes, without the copy or the join made by reading the
+        body property of a file or an iterator request body.
+        """
+        if not self._was_iter:
+            # A file body is read into bytes once, when the request is created
+            return self._body
+        if self._joined_body is None:
+            self._joined_body = _join_body_chunks(list(self._body))
+        return self._joined_body
+
+    @property
+    def _content_digest(self):
+        """
+        The digest of the body, see util.digest_body, computed once per body
+        as the body_digest matcher compares it for every stored request.
+        """
+        if self._body_digest is None:
+            self._body_digest = digest_body(self._content)
+        return self._body_digest
 
     def add_header(self, key, value):
         warnings.warn(
@@ -80,16 +171,18 @@ class Request:
 
     @property
     def host(self):
-        return self.parsed_uri.hostname
+        if self._host is None:
+            self._host = self.parsed_uri.hostname
+        return self._host
 
     @property
     def port(self):
-        port = self.parsed_uri.port
-        if port is None:
-            with suppress(KeyError):
-                port = {"https": 443, "http": 80}[self.parsed_uri.scheme]
-
-        return port
+        if self._port is None:
+            port = self.parsed_uri.port
+            if port is None:
+                port = _DEFAULT_PORTS.get(self.parsed_uri.scheme)
+            self._port = port
+        return self._port
 
     @property
     def path(self):
@@ -97,8 +190,43 @@ class Request:
 
     @property
     def query(self):
-        q = self.parsed_uri.query
-        return sorted(parse_qsl(q))
+        return list(self._query)
+
+    @property
+    def _query(self):
+        """The sorted query as a tuple, shared between calls"""
+        if self._sorted_query is None:
+            self._sorted_query = tuple(sorted(parse_qsl(self.parsed_uri.query)))
+        return self._sorted_query
+
+    def fingerprint(self, fields=FINGERPRINT_FIELDS):
+        """
+        Digest of the given fields of the request, as an hexadecimal string.
+
+        Two requests with the same fingerprint have the same value for each
+        of these fields. The fingerprint is computed once per set of fields,
+        until the method, uri or body of the request are assigned again.
+        """
+        fields = tuple(fields)
+        if self._fingerprints is None:
+            self._fingerprints = {}
+        elif fields in self._fingerprints:
+            return self._fingerprints[fields]
+
+        digest = hashlib.blake2b(digest_size=16)
+        for field in fields:
+            if field not in _FINGERPRINTABLE_FIELDS:
+                raise ValueError(f"Can not fingerprint the {field!r} field of a request")
+            value = self._content if field == "body" else getattr(self, field)
+            # Tag each value with its type, so that e.g. None and b"None" differ
+            value_type = type(value).__name__
+            if not isinstance(value, bytes):
+                value = repr(value).encode("utf-8")
+            # Prefix each value with its size so that field boundaries are unambiguous
+            digest.update(f"{field}:{value_type}:{len(value)}:".encode())
+            digest.update(value)
+        self._fingerprints[fields] = fingerprint = digest.hexdigest()
+        return fingerprint
 
     # alias for backwards compatibility
     @property
@@ -121,9 +249,41 @@ class Request:
             "method": self.method,
             "uri": self.uri,
             "body": self.body,
-            "headers": {k: [v] for k, v in self.headers.items()},
+            "headers": {k: [v] for k, v in self._iter_headers()},
         }
 
+    def __copy__(self):
+        """
+        Copy-on-write copy of the request: the uri, body and header pairs are
+        immutable and shared with the original, a copy of the headers is only
+        made once they are accessed through the headers property.
+        """
+        cls = self.__class__
+        other = cls.__new__(cls)
+        for name in Request.__slots__:
+            setattr(other, name, getattr(self, name))
+        if getattr(self, "__dict__", None):
+            other.__dict__.update(self.__dict__)
+        other._transformed_bodies = None
+        if self._fingerprints is not None:
+            other._fingerprints = dict(self._fingerprints)
+        if self._headers is not None:
+            other._headers = None
+            other._header_items = tuple(self._headers._store.values())
+        if not (self._was_file or self._was_iter or isinstance(self._body, (bytes, type(None)))):
+            # The body can be modified in place, e.g. a dict
+            other._body = copy.deepcopy(self._body)
+        return other
+
+    def __getstate__(self):
+        """
+        State of the request for pickling and deep copies, without the bodies
+        transformed by the body matcher, which are cached per transformers.
+        """
+        slots = {name: getattr(self, name) for name in Request.__slots__ if hasattr(self, name)}
+        slots["_transformed_bodies"] = None
+        return getattr(self, "__dict__", None) or None, slots
+
     @classmethod
     def _from_dict(cls, dct):
         return Request(**dct)
@@ -149,13 +309,47 @@ class HeadersDict(CaseInsensitiveDict):
     deserialized into VCR, I keep them as plain, naked dicts.
     """
 
+    # Cache of frozen_lower_items(), cleared when the headers change
+    _frozen = None
+
     def __setitem__(self, key, value):
         if isinstance(value, (tuple, list)):
             value = value[0]
 
+        lower = key.lower()
+        store = self._writable_store()
         # Preserve the case from the first time this key was set.
-        old = self._store.get(key.lower())
+        old = store.get(lower)
         if old:
             key = old[0]
 
-        super().__setitem__(key, value)
+        store[lower] = (key, value)
+        self._frozen = None
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._frozen = None
+
+    def copy(self):
+        # The copy shares the storage until either dict is modified
+        copied = HeadersDict()
+        copied._store = self._store
+        copied._shared = self._shared = True
+        copied._frozen = self._frozen
+        return copied
+
+    def frozen_lower_items(self):
+        """
+        Frozen set of the lower_items(), two HeadersDict are equal if their
+        frozen sets are. It is computed once until the headers change, and
+        raises TypeError if a value isn't hashable.
+        """
+        if self._frozen is None:
+            self._frozen = frozenset(self.lower_items())
+        return self._frozen
+
+    def __eq__(self, other):
+        if isinstance(other, HeadersDict):
+            with suppress(TypeError):
+                return self.frozen_lower_items() == other.frozen_lower_items()
+        return super().__eq__(other)
@@ -1,6 +1,11 @@
+import sys
+import warnings
+from collections.abc import Sequence
+from contextlib import suppress
+
 import yaml
 
-from vcr.request import Request
+from vcr.request import FINGERPRINT_FIELDS, Request
 from vcr.serializers import compat
 
 # version 1 cassettes started with VCR 1.0.x.
@@ -20,6 +25,34 @@ Deserializing: string (yaml converts from utf-8) -> bytestring
 """
 
 
+class LoadedCassette(tuple):
+    """
+    The ``(requests, responses)`` pair of a deserialized cassette, which also
+    carries the fingerprint of the filters configuration it was recorded with,
+    the request fields its fingerprints cover and, when it was deserialized
+    lazily, its ``LazyInteraction`` list.
+    """
+
+    def __new__(
+        cls,
+        requests,
+        responses,
+        filter_fingerprint=None,
+        interactions=None,
+        fingerprint_fields=FINGERPRINT_FIELDS,
+    ):
+        loaded_cassette = super().__new__(cls, (requests, responses))
+        loaded_cassette.filter_fingerprint = filter_fingerprint
+        loaded_cassette.interactions = interactions
+        loaded_cassette.fingerprint_fields = fingerprint_fields
+        return loaded_cassette
+
+
+def is_binary(serializer):
+    """Whether the serializer reads and writes bytes instead of strings"""
+    return getattr(serializer, "binary", False) is True
+
+
 def _looks_like_an_old_cassette(data):
     return isinstance(data, list) and len(data) and "request" in data[0]
 
@@ -32,7 +65,136 @@ def _warn_about_old_cassette_format():
     )
 
 
-def deserialize(cassette_string, serializer):
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_headers(headers, shared_lists):
+    """
+    Share the equal header names and values of a cassette. The strings are
+    interned, so they are shared across cassettes too, and the lists of
+    values are shared between the interactions of a cassette.
+    """
+    if not isinstance(headers, dict):
+        return headers
+    interned = {}
+    for name, values in headers.items():
+        if isinstance(values, list):
+            values = [_intern(value) for value in values]
+            # Unless some value isn't hashable
+            with suppress(TypeError):
+                values = shared_lists.setdefault(tuple(values), values)
+        else:
+            values = _intern(values)
+        interned[_intern(name)] = values
+    return interned
+
+
+def _check_fingerprint(request, interaction, fingerprint_fields):
+    if "fingerprint" in interaction and request.fingerprint(fingerprint_fields) != interaction["fingerprint"]:
+        warnings.warn(
+            f"The request {request!r} doesn't match the fingerprint recorded with it, "
+            "the cassette may have been modified since it was recorded.",
+            stacklevel=4,
+        )
+
+
+def _build_request(interaction, shared_lists, fingerprint_fields=FINGERPRINT_FIELDS):
+    request_dict = interaction["request"]
+    if "headers" in request_dict:
+        request_dict["headers"] = _intern_headers(request_dict["headers"], shared_lists)
+    request_dict["method"] = _intern(request_dict["method"])
+    request = Request._from_dict(request_dict)
+    _check_fingerprint(request, interaction, fingerprint_fields)
+    return request
+
+
+def _build_response(interaction, shared_lists, binary):
+    response = interaction["response"]
+    if isinstance(response, dict) and "headers" in response:
+        response["headers"] = _intern_headers(response["headers"], shared_lists)
+    # Binary formats store the bodies as bytes
+    return response if binary else compat.convert_to_bytes(response)
+
+
+class LazyInteraction(Sequence):
+    """
+    The ``(request, response)`` pair of an interaction of a lazily
+    deserialized cassette. The request is built from the recorded interaction
+    when it is first accessed, and so is the response, whose body is only
+    converted then.
+    """
+
+    __slots__ = ("_binary", "_fingerprint_fields", "_interaction", "_request", "_response", "_shared_lists")
+
+    def __init__(self, interaction, shared_lists, binary=False, fingerprint_fields=FINGERPRINT_FIELDS):
+        self._interaction = interaction
+        self._shared_lists = shared_lists
+        self._binary = binary
+        self._fingerprint_fields = fingerprint_fields
+        self._request = None
+        self._response = None
+
+    @property
+    def request(self):
+        if self._request is None:
+            self._request = _build_request(self._interaction, self._shared_lists, self._fingerprint_fields)
+        return self._request
+
+    @property
+    def response(self):
+        if self._response is None:
+            self._response = _build_response(self._interaction, self._shared_lists, self._binary)
+        return self._response
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        if index in (0, -2):
+            return self.request
+        if index in (1, -1):
+            return self.response
+        raise IndexError("interaction index out of range")
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LazyInteraction)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        built = "built" if self._request is not None else "not built"
+        return f"<LazyInteraction {self._interaction['request'].get('uri')!r} ({built})>"
+
+
+class _LazyItems(Sequence):
+    """The requests or the responses of a list of lazy interactions"""
+
+    __slots__ = ("_field", "_interactions")
+
+    def __init__(self, interactions, field):
+        self._interactions = interactions
+        self._field = field
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [interaction[self._field] for interaction in self._interactions[index]]
+        return self._interactions[index][self._field]
+
+    def __len__(self):
+        return len(self._interactions)
+
+
+def deserialize(cassette_string, serializer, lazy=False):
+    """
+    Deserialize a cassette into a ``LoadedCassette``. When lazy is true, its
+    requests and responses are built when first accessed, and its
+    ``interactions`` hold the ``LazyInteraction`` of each interaction.
+    """
     try:
         data = serializer.deserialize(cassette_string)
     # Old cassettes used to use yaml object thingy so I have to
@@ -42,18 +204,119 @@ def deserialize(cassette_string, serializer):
     if _looks_like_an_old_cassette(data):
         _warn_about_old_cassette_format()
 
-    requests = [Request._from_dict(r["request"]) for r in data["interactions"]]
-    responses = [compat.convert_to_bytes(r["response"]) for r in data["interactions"]]
-    return requests, responses
+    # Cassettes repeat the same headers over and over, share them
+    shared_lists = {}
+    binary = is_binary(serializer)
+    # The fingerprints of older cassettes cover the default fields
+    fingerprint_fields = tuple(data.get("fingerprint_fields") or FINGERPRINT_FIELDS)
+    if lazy:
+        interactions = [
+            LazyInteraction(i, shared_lists, binary, fingerprint_fields) for i in data["interactions"]
+        ]
+        return LoadedCassette(
+            _LazyItems(interactions, 0),
+            _LazyItems(interactions, 1),
+            data.get("filter_fingerprint"),
+            interactions,
+            fingerprint_fields,
+        )
+    requests = [_build_request(i, shared_lists, fingerprint_fields) for i in data["interactions"]]
+    responses = [_build_response(i, shared_lists, binary) for i in data["interactions"]]
+    return LoadedCassette(
+        requests,
+        responses,
+        data.get("filter_fingerprint"),
+        fingerprint_fields=fingerprint_fields,
+    )
+
 
+def _binary_request_dict(request):
+    request_dict = request._to_dict()
+    # File and iterator bodies are stored as the bytes they hold
+    request_dict["body"] = request._content
+    return request_dict
 
-def serialize(cassette_dict, serializer):
-    interactions = [
-        {
-            "request": compat.convert_to_unicode(request._to_dict()),
-            "response": compat.convert_to_unicode(response),
-        }
-        for request, response in zip(cassette_dict["requests"], cassette_dict["responses"], strict=False)
-    ]
+
+def _interaction_dicts(cassette_dict, serializer):
+    """
+    Yields the dict of each interaction of a cassette, as it is serialized.
+    """
+    binary = is_binary(serializer)
+    fingerprints = cassette_dict.get("fingerprints") or ()
+    pairs = zip(cassette_dict["requests"], cassette_dict["responses"], strict=False)
+    for index, (request, response) in enumerate(pairs):
+        if binary:
+            # Binary formats hold the bodies as is
+            interaction = {"request": _binary_request_dict(request), "response": response}
+        else:
+            interaction = {
+                "request": compat.convert_to_unicode(request._to_dict()),
+                "response": compat.convert_to_unicode(response),
+            }
+        if index < len(fingerprints):
+            interaction["fingerprint"] = fingerprints[index]
+        yield interaction
+
+
+class _StreamedInteractions:
+    """
+    The interactions of a cassette, converted one at a time as they are
+    iterated, so that a streaming serializer only holds one of them.
+    """
+
+    def __init__(self, cassette_dict, serializer):
+        self._cassette_dict = cassette_dict
+        self._serializer = serializer
+
+    def __len__(self):
+        return min(len(self._cassette_dict["requests"]), len(self._cassette_dict["responses"]))
+
+    def __iter__(self):
+        return _interaction_dicts(self._cassette_dict, self._serializer)
+
+
+def _cassette_data(cassette_dict, interactions):
     data = {"version": CASSETTE_FORMAT_VERSION, "interactions": interactions}
-    return serializer.serialize(data)
+    if cassette_dict.get("filter_fingerprint"):
+        data["filter_fingerprint"] = cassette_dict["filter_fingerprint"]
+    if cassette_dict.get("fingerprint_fields"):
+        data["fingerprint_fields"] = cassette_dict["fingerprint_fields"]
+    return data
+
+
+def serialize(cassette_dict, serializer):
+    interactions = list(_interaction_dicts(cassette_dict, serializer))
+    return serializer.serialize(_cassette_data(cassette_dict, interactions))
+
+
+def serialize_to(cassette_dict, serializer, write):
+    """
+    Serialize a cassette through write, e.g. the write method of a file.
+
+    Serializers with a ``serialize_to(cassette_dict, write)`` function are
+    given the interactions as a sized iterable, which converts them one at a
+    time, and write the cassette as they go. The cassette of the other
+    serializers is written at once.
+    """
+    if not hasattr(serializer, "serialize_to"):
+        write(serialize(cassette_dict, serializer))
+        return
+    interactions = _StreamedInteractions(cassette_dict, serializer)
+    serializer.serialize_to(_cassette_data(cassette_dict, interactions), write)
+
+
+def can_append(serializer):
+    """
+    Whether interactions can be appended to a cassette saved with the
+    serializer, which is the case when it has an
+    ``append_to(interactions, write)`` function.
+    """
+    return hasattr(serializer, "append_to")
+
+
+def append_to(cassette_dict, serializer, write):
+    """
+    Serialize, through write, the interactions of a cassette dict holding the
+    interactions to be appended to a saved cassette, see can_append.
+    """
+    serializer.append_to(_interaction_dicts(cassette_dict, serializer), write)
@@ -0,0 +1,168 @@
+"""
+Compact binary cassette format.
+
+Each value is a one byte type tag followed by its payload. Strings and bytes
+are prefixed with their length and stored as is, so bodies don't go through
+base64 or UTF-8 conversions, and containers are prefixed with their number of
+items. Integers are 8 bytes, floats are IEEE 754 doubles.
+"""
+
+import struct
+
+# Cassettes are read and written as bytes
+binary = True
+
+MAGIC = b"VCRB\x01"
+
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"i"
+_BIG_INT = b"I"
+_FLOAT = b"d"
+_STR = b"s"
+_BYTES = b"b"
+_LIST = b"l"
+_TUPLE = b"t"
+_DICT = b"m"
+
+_COUNT = struct.Struct(">I")
+_LENGTH = struct.Struct(">Q")
+_INT64 = struct.Struct(">q")
+_DOUBLE = struct.Struct(">d")
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def _encode(value, chunks):
+    value_type = type(value)
+    if value_type is str:
+        data = value.encode("utf-8", "surrogatepass")
+        chunks += (_STR, _LENGTH.pack(len(data)), data)
+    elif value_type is dict:
+        chunks += (_DICT, _COUNT.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, chunks)
+            _encode(item, chunks)
+    elif value_type is list:
+        chunks += (_LIST, _COUNT.pack(len(value)))
+        for item in value:
+            _encode(item, chunks)
+    elif value is None:
+        chunks.append(_NONE)
+    elif value_type is bool:
+        chunks.append(_TRUE if value else _FALSE)
+    elif value_type is int:
+        if _INT64_MIN <= value <= _INT64_MAX:
+            chunks += (_INT, _INT64.pack(value))
+        else:
+            data = str(value).encode("ascii")
+            chunks += (_BIG_INT, _LENGTH.pack(len(data)), data)
+    elif value_type is float:
+        chunks += (_FLOAT, _DOUBLE.pack(value))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        chunks += (_BYTES, _LENGTH.pack(len(value)), bytes(value))
+    elif isinstance(value, tuple):
+        chunks += (_TUPLE, _COUNT.pack(len(value)))
+        for item in value:
+            _encode(item, chunks)
+    elif isinstance(value, str):
+        _encode(str(value), chunks)
+    elif isinstance(value, dict):
+        _encode(dict(value), chunks)
+    elif isinstance(value, list):
+        _encode(list(value), chunks)
+    elif isinstance(value, int):
+        _encode(int(value), chunks)
+    else:
+        raise TypeError(f"Object of type {value_type.__name__} is not serializable in a binary cassette")
+
+
+class _Decoder:
+    def __init__(self, data, pos=0):
+        self.data = data
+        # Strings are decoded and bodies copied straight from the buffer
+        self.view = memoryview(data)
+        self.pos = pos
+
+    def decode(self):
+        data = self.data
+        # Single byte slices are cached by CPython, comparing them is cheap
+        tag = data[self.pos : self.pos + 1]
+        self.pos += 1
+        if tag in (_STR, _BYTES):
+            (length,) = _LENGTH.unpack_from(data, self.pos)
+            start = self.pos + _LENGTH.size
+            self.pos = start + length
+            if self.pos > len(data):
+                raise ValueError("Truncated binary cassette")
+            if tag == _STR:
+                return str(self.view[start : self.pos], "utf-8", "surrogatepass")
+            return bytes(self.view[start : self.pos])
+        if tag == _DICT:
+            (count,) = _COUNT.unpack_from(data, self.pos)
+            self.pos += _COUNT.size
+            decode = self.decode
+            return {decode(): decode() for _ in range(count)}
+        if tag in (_LIST, _TUPLE):
+            (count,) = _COUNT.unpack_from(data, self.pos)
+            self.pos += _COUNT.size
+            decode = self.decode
+            items = [decode() for _ in range(count)]
+            return items if tag == _LIST else tuple(items)
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            (value,) = _INT64.unpack_from(data, self.pos)
+            self.pos += _INT64.size
+            return value
+        if tag == _BIG_INT:
+            (length,) = _LENGTH.unpack_from(data, self.pos)
+            start = self.pos + _LENGTH.size
+            self.pos = start + length
+            return int(str(self.view[start : self.pos], "ascii"))
+        if tag == _FLOAT:
+            (value,) = _DOUBLE.unpack_from(data, self.pos)
+            self.pos += _DOUBLE.size
+            return value
+        raise ValueError(f"Unknown type tag {tag!r} at offset {self.pos - 1} of the binary cassette")
+
+
+def deserialize(cassette_string):
+    if not cassette_string.startswith(MAGIC):
+        raise ValueError("Not a binary cassette")
+    try:
+        return _Decoder(bytes(cassette_string), len(MAGIC)).decode()
+    except struct.error as err:
+        raise ValueError("Truncated binary cassette") from err
+
+
+def serialize(cassette_dict):
+    chunks = [MAGIC]
+    _encode(cassette_dict, chunks)
+    return b"".join(chunks)
+
+
+def serialize_to(cassette_dict, write):
+    """
+    Write the same bytes as serialize, one interaction at a time.
+    """
+    write(MAGIC + _DICT + _COUNT.pack(len(cassette_dict)))
+    for key, value in cassette_dict.items():
+        chunks = []
+        _encode(key, chunks)
+        if key != "interactions":
+            _encode(value, chunks)
+            write(b"".join(chunks))
+            continue
+        chunks += (_LIST, _COUNT.pack(len(value)))
+        write(b"".join(chunks))
+        for interaction in value:
+            chunks = []
+            _encode(interaction, chunks)
+            write(b"".join(chunks))
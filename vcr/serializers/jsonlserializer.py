@@ -0,0 +1,47 @@
+"""
+JSON Lines cassette format.
+
+The first line is a header holding the fields of the cassette, each of the
+next ones holds an interaction. The interactions recorded since a cassette
+was loaded can thus be appended to it instead of rewriting it.
+"""
+
+import json
+
+from .jsonserializer import _ERROR_MESSAGE
+
+
+def _dumps(value):
+    try:
+        return json.dumps(value) + "\n"
+    except TypeError:
+        raise TypeError(_ERROR_MESSAGE) from None
+
+
+def deserialize(cassette_string):
+    records = (line for line in cassette_string.splitlines() if line.strip())
+    header = next(records, None)
+    if header is None:
+        raise ValueError("Empty JSON Lines cassette")
+    cassette_dict = json.loads(header)
+    cassette_dict["interactions"] = [json.loads(record) for record in records]
+    return cassette_dict
+
+
+def serialize(cassette_dict):
+    chunks = []
+    serialize_to(cassette_dict, chunks.append)
+    return "".join(chunks)
+
+
+def serialize_to(cassette_dict, write):
+    write(_dumps({key: value for key, value in cassette_dict.items() if key != "interactions"}))
+    append_to(cassette_dict["interactions"], write)
+
+
+def append_to(interactions, write):
+    """
+    Write the records of interactions to be appended to a cassette.
+    """
+    for interaction in interactions:
+        write(_dumps(interaction))
@@ -1,18 +1,45 @@
 import json
 
+_ERROR_MESSAGE = (
+    "Does this HTTP interaction contain binary data? "
+    "If so, use a different serializer (like the yaml serializer) "
+    "for this request?"
+)
+
 
 def deserialize(cassette_string):
     return json.loads(cassette_string)
 
 
 def serialize(cassette_dict):
-    error_message = (
-        "Does this HTTP interaction contain binary data? "
-        "If so, use a different serializer (like the yaml serializer) "
-        "for this request?"
-    )
-
     try:
         return json.dumps(cassette_dict, indent=4) + "\n"
     except TypeError:
-        raise TypeError(error_message) from None
+        raise TypeError(_ERROR_MESSAGE) from None
+
+
+def _dumps(value, level):
+    # Indent the lines of the value at the level it is nested at
+    return json.dumps(value, indent=4).replace("\n", "\n" + "    " * level)
+
+
+def serialize_to(cassette_dict, write):
+    """
+    Write the same JSON as serialize, one interaction at a time.
+    """
+    try:
+        separator = "{"
+        for key, value in cassette_dict.items():
+            write(f"{separator}\n    {json.dumps(key)}: ")
+            separator = ","
+            if key != "interactions":
+                write(_dumps(value, 1))
+                continue
+            item_separator = "["
+            for interaction in value:
+                write(f"{item_separator}\n        {_dumps(interaction, 2)}")
+                item_separator = ","
+            write("[]" if item_separator == "[" else "\n    ]")
+        write("{}\n" if separator == "{" else "\n}\n")
+    except TypeError:
+        raise TypeError(_ERROR_MESSAGE) from None
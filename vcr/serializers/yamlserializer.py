@@ -11,6 +11,14 @@ except ImportError:
     from yaml import SafeLoader as _BaseLoader
 
 
+class _CassetteDumper(Dumper):
+    """A YAML dumper that writes shared values, such as the header lists
+    shared on load, in full instead of as anchors and aliases."""
+
+    def ignore_aliases(self, data):
+        return True
+
+
 class _CassetteLoader(_BaseLoader):
     """A safe YAML loader for cassettes.
 
@@ -72,4 +80,22 @@ def deserialize(cassette_string):
 
 
 def serialize(cassette_dict):
-    return yaml.dump(cassette_dict, Dumper=Dumper)
+    return yaml.dump(cassette_dict, Dumper=_CassetteDumper)
+
+
+def serialize_to(cassette_dict, write):
+    """
+    Write the same YAML as serialize, one interaction at a time.
+    """
+    for key in sorted(cassette_dict):
+        value = cassette_dict[key]
+        if key != "interactions":
+            write(yaml.dump({key: value}, Dumper=_CassetteDumper))
+        elif not len(value):
+            write("interactions: []\n")
+        else:
+            # Block sequences aren't indented in mappings, the interactions
+            # are written as they would be at the top level
+            write("interactions:\n")
+            for interaction in value:
+                write(yaml.dump([interaction], Dumper=_CassetteDumper))
@@ -270,12 +270,13 @@ class VCRConnection:
         """Retrieve the response"""
         # Check to see if the cassette has a response for this request. If so,
         # then return it
-        if self.cassette.can_play_response_for(self._vcr_request):
+        playback = self.cassette.lookup(self._vcr_request)
+        if playback.can_play:
             log.info(f"Playing response for {self._vcr_request} from cassette")
-            response = self.cassette.play_response(self._vcr_request)
+            response = playback.play()
             return VCRHTTPResponse(response, self._vcr_request.uri)
         else:
-            if self.cassette.write_protected and self.cassette.filter_request(self._vcr_request):
+            if self.cassette.write_protected and playback.filtered_request:
                 raise CannotOverwriteExistingCassetteException(
                     cassette=self.cassette,
                     failed_request=self._vcr_request,
@@ -321,7 +322,7 @@ class VCRConnection:
         and are not write-protected.
         """
 
-        if hasattr(self, "_vcr_request") and self.cassette.can_play_response_for(self._vcr_request):
+        if hasattr(self, "_vcr_request") and self.cassette.lookup(self._vcr_request).can_play:
             # We already have a response we are going to play, don't
             # actually connect
             return
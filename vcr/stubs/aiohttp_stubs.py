@@ -26,6 +26,9 @@ log = logging.getLogger(__name__)
 _CLIENT_RESPONSE_PARAMS = inspect.signature(ClientResponse.__init__).parameters
 _CLIENT_RESPONSE_ACCEPTS_STREAM_WRITER = "stream_writer" in _CLIENT_RESPONSE_PARAMS
 
+# Number of similar requests tried when a redirect has no recorded match
+_MAX_SIMILAR_REDIRECT_REQUESTS = 10
+
 
 class MockStream(asyncio.StreamReader):
     # aiohttp added the async-iteration helpers below to its response stream via
@@ -142,10 +145,11 @@ def _deserialize_headers(headers):
     return CIMultiDictProxy(deserialized_headers)
 
 
-def play_responses(cassette, vcr_request, kwargs):
+def play_responses(cassette, playback, kwargs):
     history = []
     allow_redirects = kwargs.get("allow_redirects", True)
-    vcr_response = cassette.play_response(vcr_request)
+    vcr_request = playback.request
+    vcr_response = playback.play()
     response = build_response(vcr_request, vcr_response, history)
 
     # If we're following redirects, continue playing until we reach
@@ -161,15 +165,23 @@ def play_responses(cassette, vcr_request, kwargs):
         # may have edge cases based on the headers we're providing (e.g. if
         # there's a matcher that is used to filter by headers).
         vcr_request = Request("GET", str(next_url), None, _serialize_headers(response.request_info.headers))
-        vcr_requests = cassette.find_requests_with_most_matches(vcr_request)
-        for vcr_request, *_ in vcr_requests:
-            if cassette.can_play_response_for(vcr_request):
-                break
+        playback = cassette.lookup(vcr_request)
+        if not playback.can_play:
+            similar_requests = cassette.find_requests_with_most_matches(
+                vcr_request,
+                limit=_MAX_SIMILAR_REDIRECT_REQUESTS,
+            )
+            for similar_request, *_ in similar_requests:
+                playback = cassette.lookup(similar_request)
+                if playback.can_play:
+                    break
+        # The response is built from the request as it was recorded
+        vcr_request = playback.recorded_request or playback.request
 
         # Tack on the response we saw from the redirect into the history
         # list that is added on to the final response.
         history.append(response)
-        vcr_response = cassette.play_response(vcr_request)
+        vcr_response = playback.play()
         response = build_response(vcr_request, vcr_response, history)
 
     return response
@@ -289,15 +301,16 @@ def vcr_request(cassette, real_request):
 
         vcr_request = Request(method, str(request_url), data, _serialize_headers(headers))
 
-        if cassette.can_play_response_for(vcr_request):
+        playback = cassette.lookup(vcr_request)
+        if playback.can_play:
             log.info(f"Playing response for {vcr_request} from cassette")
-            response = play_responses(cassette, vcr_request, kwargs)
+            response = play_responses(cassette, playback, kwargs)
             for redirect in response.history:
                 self._cookie_jar.update_cookies(redirect.cookies, redirect.url)
             self._cookie_jar.update_cookies(response.cookies, response.url)
             return response
 
-        if cassette.write_protected and cassette.filter_request(vcr_request):
+        if cassette.write_protected and playback.filtered_request:
             raise CannotOverwriteExistingCassetteException(cassette=cassette, failed_request=vcr_request)
 
         log.info("%s not in cassette, sending to real server", vcr_request)
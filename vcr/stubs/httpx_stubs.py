@@ -84,10 +84,11 @@ def _make_vcr_request(real_request, real_request_body):
 def _vcr_request(cassette, real_request, real_request_body, httpx):
     vcr_request = _make_vcr_request(real_request, real_request_body)
 
-    if cassette.can_play_response_for(vcr_request):
-        return vcr_request, _play_responses(cassette, vcr_request, httpx)
+    playback = cassette.lookup(vcr_request)
+    if playback.can_play:
+        return vcr_request, _play_responses(playback, httpx)
 
-    if cassette.write_protected and cassette.filter_request(vcr_request):
+    if cassette.write_protected and playback.filtered_request:
         raise CannotOverwriteExistingCassetteException(cassette=cassette, failed_request=vcr_request)
 
     _logger.info("%s not in cassette, sending to real server", vcr_request)
@@ -99,8 +100,8 @@ def _record_responses(cassette, vcr_request, real_response, real_response_conten
     cassette.append(vcr_request, _serialize_response(real_response, real_response_content))
 
 
-def _play_responses(cassette, vcr_request, httpx):
-    vcr_response = cassette.play_response(vcr_request)
+def _play_responses(playback, httpx):
+    vcr_response = playback.play()
     real_response = _deserialize_response(vcr_response, httpx)
 
     return real_response
@@ -40,8 +40,9 @@ def vcr_fetch_impl(cassette, real_fetch_impl):
 
         vcr_request = Request(request.method, request.url, request.body, headers)
 
-        if cassette.can_play_response_for(vcr_request):
-            vcr_response = cassette.play_response(vcr_request)
+        playback = cassette.lookup(vcr_request)
+        if playback.can_play:
+            vcr_response = playback.play()
             headers = httputil.HTTPHeaders()
 
             recorded_headers = vcr_response["headers"]
@@ -61,7 +62,7 @@ def vcr_fetch_impl(cassette, real_fetch_impl):
             )
             return callback(response)
         else:
-            if cassette.write_protected and cassette.filter_request(vcr_request):
+            if cassette.write_protected and playback.filtered_request:
                 response = HTTPResponse(
                     request,
                     599,
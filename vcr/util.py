@@ -1,3 +1,4 @@
+import hashlib
 import types
 from collections.abc import Mapping, MutableMapping
 
@@ -28,20 +29,36 @@ class CaseInsensitiveDict(MutableMapping):
 
     def __init__(self, data=None, **kwargs):
         self._store = {}
+        # Whether _store is shared with a copy, and must be copied before
+        # being modified.
+        self._shared = False
         if data is None:
             data = {}
         self.update(data, **kwargs)
 
+    def _writable_store(self):
+        if self._shared:
+            self._store = dict(self._store)
+            self._shared = False
+        return self._store
+
     def __setitem__(self, key, value):
         # Use the lowercased key for lookups, but store the actual
         # key alongside the value.
-        self._store[key.lower()] = (key, value)
+        self._writable_store()[key.lower()] = (key, value)
 
     def __getitem__(self, key):
         return self._store[key.lower()][1]
 
     def __delitem__(self, key):
-        del self._store[key.lower()]
+        del self._writable_store()[key.lower()]
+
+    def __contains__(self, key):
+        return key.lower() in self._store
+
+    def get(self, key, default=None):
+        item = self._store.get(key.lower())
+        return default if item is None else item[1]
 
     def __iter__(self):
         return (casedkey for casedkey, mappedvalue in self._store.values())
@@ -55,7 +72,8 @@ class CaseInsensitiveDict(MutableMapping):
 
     def __eq__(self, other):
         if isinstance(other, Mapping):
-            other = CaseInsensitiveDict(other)
+            if not isinstance(other, CaseInsensitiveDict):
+                other = CaseInsensitiveDict(other)
         else:
             return NotImplemented
         # Compare insensitively
@@ -63,7 +81,11 @@ class CaseInsensitiveDict(MutableMapping):
 
     # Copy is required
     def copy(self):
-        return CaseInsensitiveDict(self._store.values())
+        # The copy shares the storage until either dict is modified
+        copied = CaseInsensitiveDict()
+        copied._store = self._store
+        copied._shared = self._shared = True
+        return copied
 
     def __repr__(self):
         return str(dict(self.items()))
@@ -96,21 +118,53 @@ def _is_nonsequence_iterator(obj):
     )
 
 
+def _join_body_chunks(chunks):
+    if chunks:
+        if isinstance(chunks[0], str):
+            return "".join(chunks).encode("utf-8")
+        elif isinstance(chunks[0], (bytes, bytearray)):
+            return b"".join(chunks)
+        elif isinstance(chunks[0], int):
+            return bytes(chunks)
+        else:
+            raise ValueError(f"Body type {type(chunks[0])} not supported")
+    return b""
+
+
+_BODY_DIGEST_PREFIX = b"vcr-body-digest:sha256="
+
+
+def digest_body(body):
+    """
+    The digest standing for a request body: its SHA-256 and its length.
+    A body that is already a digest is its own digest.
+    """
+    if body is None:
+        body = b""
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, (bytes, bytearray)):
+        body = repr(body).encode("utf-8")
+    if is_body_digest(body):
+        return bytes(body)
+    sha256 = hashlib.sha256(body).hexdigest().encode("ascii")
+    return b"%s%s;length=%d" % (_BODY_DIGEST_PREFIX, sha256, len(body))
+
+
+def is_body_digest(body):
+    return isinstance(body, (bytes, bytearray)) and body.startswith(_BODY_DIGEST_PREFIX)
+
+
 def read_body(request):
+    from .request import Request
+
+    if isinstance(request, Request):
+        # The body is only read, or joined, once per request
+        return request._content
     if hasattr(request.body, "read"):
         return request.body.read()
     if _is_nonsequence_iterator(request.body):
-        body = list(request.body)
-        if body:
-            if isinstance(body[0], str):
-                return "".join(body).encode("utf-8")
-            elif isinstance(body[0], (bytes, bytearray)):
-                return b"".join(body)
-            elif isinstance(body[0], int):
-                return bytes(body)
-            else:
-                raise ValueError(f"Body type {type(body[0])} not supported")
-        return b""
+        return _join_body_chunks(list(request.body))
     return request.body
 
 